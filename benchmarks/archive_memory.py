@@ -0,0 +1,140 @@
+"""
+Peak memory of decoding Chess.com monthly archive
+
+Compares decoding the whole archive at once and filtering the list of games
+with decoding and filtering games one by one, as `ChessComFetcher` does.
+Games are either consumed one at a time, as by the pipeline, or all kept,
+as by `fetch`. A recorded archive can be given, otherwise archive of blitz
+games with clock comments is generated.
+
+Usage:
+    python -m benchmarks.archive_memory [--archive PATH] [--games N]
+"""
+
+from argparse import ArgumentParser
+from json import dumps, loads
+from random import Random
+from time import perf_counter
+from tracemalloc import get_traced_memory, reset_peak, start, stop
+from typing import Any, Callable, Iterable
+from uuid import UUID
+
+from chess import Board
+
+from src.fetcher.archive import CHESSCOM_FIELDS, archive_games
+
+
+def generate_archive(count: int, seed: int = 0) -> str:
+    """Generates archive of Chess.com games of random moves"""
+    random = Random(seed)
+    games: list[dict[str, Any]] = []
+    for i in range(count):
+        board, moves = Board(), []
+        for ply in range(80):
+            legal_moves = list(board.legal_moves)
+            if not legal_moves:
+                break
+            move = random.choice(legal_moves)
+            number = f"{ply // 2 + 1}{'.' if ply % 2 == 0 else '...'}"
+            clock = f"0:0{random.randint(0, 2)}:{random.randint(10, 59)}.{random.randint(0, 9)}"
+            moves.append(f"{number} {board.san(move)} {{[%clk {clock}]}}")
+            board.push(move)
+        end_time = 1719792000 + i * 600
+        headers = "".join(
+            f'[{name} "{value}"]\n'
+            for name, value in (
+                ("Event", "Live Chess"),
+                ("Site", "Chess.com"),
+                ("Date", "2024.07.01"),
+                ("White", "white"),
+                ("Black", "black"),
+                ("Result", "*"),
+                ("ECO", "A00"),
+                ("TimeControl", "180"),
+                ("EndTime", "12:00:00 PDT"),
+                ("Termination", "Game abandoned"),
+            )
+        )
+        games.append(
+            {
+                "url": f"https://www.chess.com/game/live/{i}",
+                "pgn": f"{headers}\n{' '.join(moves)} *\n",
+                "time_control": "180",
+                "end_time": end_time,
+                "rated": True,
+                "tcn": "".join(move[-4:] for move in moves),
+                "uuid": str(UUID(int=random.getrandbits(128))),
+                "initial_setup": "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+                "fen": board.fen(),
+                "time_class": "blitz",
+                "rules": "chess" if i % 10 else "chess960",
+                "accuracies": {"white": 80.5, "black": 75.1},
+                "white": {
+                    "rating": 1500,
+                    "result": "win",
+                    "@id": "https://api.chess.com/pub/player/white",
+                    "username": "white",
+                    "uuid": str(UUID(int=random.getrandbits(128))),
+                },
+                "black": {
+                    "rating": 1500,
+                    "result": "resigned",
+                    "@id": "https://api.chess.com/pub/player/black",
+                    "username": "black",
+                    "uuid": str(UUID(int=random.getrandbits(128))),
+                },
+                "eco": "https://www.chess.com/openings/Undefined",
+            }
+        )
+    return dumps({"games": games})
+
+
+def whole(body: str) -> Iterable[dict[str, Any]]:
+    return [game for game in loads(body)["games"] if game["rules"] == "chess"]
+
+
+def incremental(body: str) -> Iterable[dict[str, Any]]:
+    for game in archive_games(body):
+        if game["rules"] == "chess":
+            yield {field: game[field] for field in CHESSCOM_FIELDS if field in game}
+
+
+def measure(
+    decode: Callable[[str], Iterable[dict[str, Any]]], body: str, keep: bool
+) -> tuple[float, float]:
+    """Returns peak memory above the body in MiB and elapsed seconds"""
+    start()
+    reset_peak()
+    before = perf_counter()
+    kept = [] if keep else None
+    for game in decode(body):
+        if kept is not None:
+            kept.append(game)
+    elapsed = perf_counter() - before
+    peak = get_traced_memory()[1]
+    stop()
+    return peak / 2**20, elapsed
+
+
+def main():
+    argument_parser = ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--archive", type=str, default=None)
+    argument_parser.add_argument("--games", type=int, default=3000)
+    args = argument_parser.parse_args()
+
+    if args.archive is not None:
+        with open(args.archive, encoding="utf-8") as file:
+            body = file.read()
+    else:
+        body = generate_archive(args.games)
+    print(f"archive: {len(body) / 2**20:.1f} MiB")
+
+    for keep in (False, True):
+        print("all games kept" if keep else "games consumed one by one")
+        for name, decode in (("whole", whole), ("incremental", incremental)):
+            peak, elapsed = measure(decode, body, keep)
+            print(f"{name:>14}: {peak:>7.2f} MiB peak {elapsed:>6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Scripted UCI engine
+
+Stands in for Stockfish in benchmarks that measure the cost of talking
+to the engine rather than the engine itself. Every search iteration takes
+a fixed amount of time and reports deterministic scores derived from the
+position, so runs are reproducible.
+
+Usage:
+    python benchmarks/fake_uci.py [--delay SECONDS] [--startup SECONDS]
+"""
+
+from argparse import ArgumentParser
+from hashlib import md5
+from sys import stdin, stdout
+from threading import Event, Lock, Thread
+from time import monotonic, sleep
+
+try:
+    from chess import Board
+except ImportError:  # pv moves are not legal without python-chess
+    Board = None
+
+
+output_lock = Lock()
+
+
+def send(line: str) -> None:
+    with output_lock:
+        stdout.write(line + "\n")
+        stdout.flush()
+
+
+class FakeEngine:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.options: dict[str, str] = {"MultiPV": "1"}
+        self.position = "startpos"
+        self.stop_event = Event()
+        self.search: Thread | None = None
+
+    def set_position(self, command: str) -> None:
+        self.position = command.removeprefix("position").strip()
+
+    def set_option(self, command: str) -> None:
+        parts = command.split(" ")
+        if "name" in parts and "value" in parts:
+            name = " ".join(parts[parts.index("name") + 1 : parts.index("value")])
+            self.options[name] = " ".join(parts[parts.index("value") + 1 :])
+
+    def go(self, command: str) -> None:
+        self.wait()
+        parts = command.split(" ")
+        limits = {
+            key: int(parts[i + 1])
+            for i, key in enumerate(parts[:-1])
+            if key in ("depth", "movetime", "nodes")
+        }
+        self.stop_event.clear()
+        self.search = Thread(target=self.run_search, args=(limits,), daemon=True)
+        self.search.start()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        self.wait()
+
+    def wait(self) -> None:
+        if self.search is not None:
+            self.search.join()
+            self.search = None
+
+    def run_search(self, limits: dict[str, int]) -> None:
+        started = monotonic()
+        moves = self.legal_moves()
+        multipv = max(1, min(int(self.options.get("MultiPV", "1")), len(moves)))
+        seed = int(md5(self.position.encode()).hexdigest(), 16)
+        max_depth = limits.get("depth", 245 if limits else 1)
+        nodes = 0
+
+        if not moves:
+            send("info depth 0 score mate 0")
+            send("bestmove (none)")
+            return None
+
+        for depth in range(1, max_depth + 1):
+            if self.stop_event.wait(self.delay):
+                break
+            nodes += 1000 * depth * depth
+            elapsed = int((monotonic() - started) * 1000)
+            for k in range(multipv):
+                score = (seed >> (k * 8)) % 300 - 150 - 20 * k
+                pv = " ".join(moves[(k + i) % len(moves)] for i in range(3))
+                send(
+                    f"info depth {depth} seldepth {depth + 2} multipv {k + 1} "
+                    f"score cp {score} nodes {nodes} nps {nodes * 1000 // max(1, elapsed)} "
+                    f"hashfull 0 tbhits 0 time {elapsed} pv {pv}"
+                )
+            if "movetime" in limits and elapsed >= limits["movetime"]:
+                break
+            if "nodes" in limits and nodes >= limits["nodes"]:
+                break
+
+        send(f"bestmove {moves[0]}")
+
+    def legal_moves(self) -> list[str]:
+        if Board is None:
+            return ["e2e4", "d2d4", "g1f3", "c2c4"]
+
+        parts = self.position.split(" ")
+        if parts[0] == "fen":
+            end = parts.index("moves") if "moves" in parts else len(parts)
+            board = Board(" ".join(parts[1:end]))
+        else:
+            board = Board()
+        if "moves" in parts:
+            for move in parts[parts.index("moves") + 1 :]:
+                if move:
+                    board.push_uci(move)
+        return sorted(move.uci() for move in board.legal_moves)
+
+
+def main():
+    argument_parser = ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--delay", type=float, default=0.0)
+    argument_parser.add_argument("--startup", type=float, default=0.0)
+    args = argument_parser.parse_args()
+
+    engine = FakeEngine(args.delay)
+    for line in stdin:
+        command = line.strip()
+        if command == "uci":
+            sleep(args.startup)
+            send("id name FakeUCI")
+            send("option name MultiPV type spin default 1 min 1 max 500")
+            send("uciok")
+        elif command == "isready":
+            send("readyok")
+        elif command.startswith("setoption"):
+            engine.set_option(command)
+        elif command.startswith("position"):
+            engine.set_position(command)
+        elif command.startswith("go"):
+            engine.go(command)
+        elif command == "stop":
+            engine.stop()
+        elif command == "quit":
+            engine.stop()
+            break
+
+
+if __name__ == "__main__":
+    main()
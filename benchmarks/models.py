@@ -0,0 +1,71 @@
+"""
+Memory and construction time of analysis models
+
+Creates analyses the way the analysis parser does, a `Move` with its
+`SanMove` and `UciMove`, a `Score` and an `Analysis` per line, once with
+validating constructors and once with trusted ones.
+
+Usage:
+    python -m benchmarks.models [--games N] [--plies N] [--multipv N]
+"""
+
+from argparse import ArgumentParser
+from time import perf_counter
+from tracemalloc import get_traced_memory, start, stop
+from typing import Any, Callable
+
+from src.models import Analysis, Color, Move, SanMove, Score, ScoreName, UciMove
+
+
+def validated(san: str, uci: str, side: Color, multipv: int, value: int) -> Any:
+    return Analysis(
+        Move(SanMove(san), UciMove(uci), side), multipv, Score(ScoreName.CP, value)
+    )
+
+
+def trusted(san: str, uci: str, side: Color, multipv: int, value: int) -> Any:
+    return Analysis.trusted(
+        Move.trusted(SanMove.trusted(san), UciMove.trusted(uci), side),
+        multipv,
+        Score.trusted(ScoreName.CP, value),
+    )
+
+
+def create(create_analysis: Callable[..., Any], count: int, multipv: int) -> list[Any]:
+    sides = (Color.WHITE, Color.BLACK)
+    return [
+        create_analysis("Nxe4+", "f6e4", sides[i % 2], line, i % 500)
+        for i in range(count)
+        for line in range(1, multipv + 1)
+    ]
+
+
+def main():
+    argument_parser = ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--games", type=int, default=1000)
+    argument_parser.add_argument("--plies", type=int, default=80)
+    argument_parser.add_argument("--multipv", type=int, default=3)
+    args = argument_parser.parse_args()
+
+    count = args.games * args.plies
+    print(f"analyses: {count * args.multipv}")
+    for name, create_analysis in (("validated", validated), ("trusted", trusted)):
+        before = perf_counter()
+        analyses = create(create_analysis, count, args.multipv)
+        elapsed = perf_counter() - before
+        del analyses
+
+        start()
+        analyses = create(create_analysis, count, args.multipv)
+        size = get_traced_memory()[0]
+        stop()
+        del analyses
+
+        per_analysis = size / (count * args.multipv)
+        print(
+            f"{name:>10}: {elapsed:>6.2f} s {size / 2**20:>8.1f} MiB {per_analysis:>6.0f} B/analysis"
+        )
+
+
+if __name__ == "__main__":
+    main()
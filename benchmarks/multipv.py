@@ -0,0 +1,59 @@
+"""
+Engine time with fixed and adaptive MultiPV
+
+Analyzes the same game with every position searched with all lines, and with
+adaptive MultiPV, where positions are searched with a single line and only
+candidate puzzle positions are searched again with all lines. Both modes
+search to the same depth. Needs a real Stockfish executable.
+
+Usage:
+    python -m benchmarks.multipv [--engine PATH] [--depth N] [--multipv N] [--workers N]
+"""
+
+from argparse import ArgumentParser
+from asyncio import run
+from time import perf_counter
+
+from src.engine.stockfish import LocalStockfishEngine, Triage
+
+from .utils import GAME_FEN, GAME_MOVES
+
+
+async def benchmark(
+    path: str, depth: int, multipv: int, workers: int, triage: Triage | None
+) -> tuple[float, int]:
+    engine = LocalStockfishEngine(path, depth, multipv, workers, triage=triage)
+    async with engine:
+        before = perf_counter()
+        analyses = await engine.analyze(GAME_FEN, GAME_MOVES)
+        elapsed = perf_counter() - before
+    escalated = sum(1 for lines in analyses if lines and len(lines) > 1)
+    return elapsed, escalated
+
+
+def main():
+    argument_parser = ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--engine", default="stockfish")
+    argument_parser.add_argument("--depth", type=int, default=18)
+    argument_parser.add_argument("--multipv", type=int, default=3)
+    argument_parser.add_argument("--workers", type=int, default=4)
+    args = argument_parser.parse_args()
+
+    print(
+        f"positions: {len(GAME_MOVES) + 1}, depth: {args.depth}, "
+        f"multipv: {args.multipv}, workers: {args.workers}"
+    )
+    baseline = None
+    for name, triage in (("fixed", None), ("adaptive", Triage(depth=None))):
+        elapsed, escalated = run(
+            benchmark(args.engine, args.depth, args.multipv, args.workers, triage)
+        )
+        baseline = baseline or elapsed
+        print(
+            f"{name:>10}: {elapsed:.2f} s ({elapsed / baseline:.0%}), "
+            f"{escalated} positions with multiple lines"
+        )
+
+
+if __name__ == "__main__":
+    main()
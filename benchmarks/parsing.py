@@ -0,0 +1,94 @@
+"""
+Games parsed per second with number of processes
+
+Parses the same batch of generated Lichess games serially and with process
+pools of growing size. Games share their openings, like games of a single
+player do.
+
+Usage:
+    python -m benchmarks.parsing [--games N] [--max-workers N]
+"""
+
+from argparse import ArgumentParser
+from asyncio import run
+from concurrent.futures import ProcessPoolExecutor
+from os import cpu_count
+from random import Random
+from time import perf_counter
+from typing import Any
+
+from chess import Board
+
+from src.parser import LichessGameParser, parse_many
+
+
+def generate_games(count: int, openings: int = 20, seed: int = 0) -> list[Any]:
+    """Generates Lichess games of random moves sharing their first 12 plies"""
+    random = Random(seed)
+    prefixes: list[tuple[list[str], Board]] = []
+    for _ in range(openings):
+        board, san_moves = Board(), []
+        for _ in range(12):
+            move = random.choice(list(board.legal_moves))
+            san_moves.append(board.san(move))
+            board.push(move)
+        prefixes.append((san_moves, board))
+
+    games: list[Any] = []
+    for i in range(count):
+        prefix, board = prefixes[i % openings]
+        board, san_moves = board.copy(), list(prefix)
+        for _ in range(60):
+            moves = list(board.legal_moves)
+            if not moves:
+                break
+            move = random.choice(moves)
+            san_moves.append(board.san(move))
+            board.push(move)
+        games.append(
+            {
+                "id": f"game{i}",
+                "players": {
+                    "white": {"user": {"name": "white"}, "rating": 1500},
+                    "black": {"user": {"name": "black"}, "rating": 1500},
+                },
+                "moves": " ".join(san_moves),
+            }
+        )
+    return games
+
+
+async def benchmark(games: list[Any], workers: int) -> float:
+    parser = LichessGameParser()
+    if workers == 0:
+        before = perf_counter()
+        await parse_many(parser, games, "white")
+        return perf_counter() - before
+
+    with ProcessPoolExecutor(workers) as executor:
+        # Warm up processes, so start-up is not measured
+        await parse_many(parser, games[: workers * 2], "white", executor, 1)
+        before = perf_counter()
+        await parse_many(parser, games, "white", executor)
+        return perf_counter() - before
+
+
+def main():
+    argument_parser = ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--games", type=int, default=5000)
+    argument_parser.add_argument("--max-workers", type=int, default=cpu_count() or 1)
+    args = argument_parser.parse_args()
+
+    games = generate_games(args.games)
+    print(f"games: {len(games)}")
+    workers = [0] + [
+        2**i for i in range(args.max_workers.bit_length()) if 2**i <= args.max_workers
+    ]
+    for count in workers:
+        elapsed = run(benchmark(games, count))
+        name = "serial" if count == 0 else f"{count} processes"
+        print(f"{name:>12}: {len(games) / elapsed:>8.0f} games/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Nodes searched to reach fixed depth with each scheduling mode
+
+Analyzes the same game with shared and segmented scheduling. With segmented
+scheduling consecutive positions stay on one Stockfish process, so fewer
+nodes are needed to reach the same depth thanks to the warm hash table.
+Needs a real Stockfish executable.
+
+Usage:
+    python -m benchmarks.scheduling [--engine PATH] [--depth N] [--workers N]
+"""
+
+from argparse import ArgumentParser
+from asyncio import run
+from time import perf_counter
+
+from src.engine.stockfish import LocalStockfishEngine
+from src.engine.stockfish.scheduling import Scheduling
+
+from .utils import GAME_FEN, GAME_MOVES
+
+
+MODES = [
+    ("shared", Scheduling.SHARED, False),
+    ("segmented", Scheduling.SEGMENTED, False),
+    ("segmented backwards", Scheduling.SEGMENTED, True),
+]
+
+
+async def benchmark(
+    path: str, depth: int, workers: int, scheduling: Scheduling, backwards: bool
+) -> tuple[int, float]:
+    engine = LocalStockfishEngine(
+        path, depth, 1, workers, scheduling=scheduling, backwards=backwards
+    )
+    async with engine:
+        before = perf_counter()
+        analyses = await engine.analyze(GAME_FEN, GAME_MOVES)
+        elapsed = perf_counter() - before
+    nodes = sum(lines[0].nodes for lines in analyses if lines)
+    return nodes, elapsed
+
+
+def main():
+    argument_parser = ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--engine", default="stockfish")
+    argument_parser.add_argument("--depth", type=int, default=18)
+    argument_parser.add_argument("--workers", type=int, default=4)
+    args = argument_parser.parse_args()
+
+    print(
+        f"positions: {len(GAME_MOVES) + 1}, depth: {args.depth}, workers: {args.workers}"
+    )
+    baseline = None
+    for name, scheduling, backwards in MODES:
+        nodes, elapsed = run(
+            benchmark(args.engine, args.depth, args.workers, scheduling, backwards)
+        )
+        baseline = baseline or nodes
+        print(
+            f"{name:>20}: {nodes:>12} nodes ({nodes / baseline:.0%}), {elapsed:.2f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+from contextlib import contextmanager
+from os import chmod
+from pathlib import Path
+from sys import executable
+from tempfile import TemporaryDirectory
+from typing import Iterator
+
+
+FAKE_UCI = Path(__file__).with_name("fake_uci.py")
+
+GAME_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+# fmt: off
+GAME_MOVES = [
+    "e2e4", "e7e6", "d2d4", "a7a6", "a2a3", "d7d5", "b1c3", "d5e4", "c3e4", "h7h6", "g1f3", "f8e7", "c1f4", "g8f6", "f1d3",
+    "b7b5", "e1g1", "c8b7", "f1e1", "b8d7", "d1d2", "c7c5", "c2c3", "c5c4", "d3c2", "d7b6", "a1d1", "b6d5", "f4g3", "f6h5",
+    "f3e5", "d5f6", "d2e2", "d8d5", "f2f3", "h5g3", "h2g3", "d5d8", "g1f2", "f6e4", "c2e4", "b7e4", "e2e4", "e8g8", "e1h1",
+    "e7f6", "e5g4", "d8e7", "g4h6", "g7h6", "h1h6", "f8d8", "d1h1", "a8c8", "h6h8", "f6h8", "e4h7", "g8f8", "h7h8",
+]
+# fmt: on
+
+
+@contextmanager
+def fake_engine(delay: float = 0.0, startup: float = 0.0) -> Iterator[str]:
+    """
+    Creates executable running the scripted UCI engine
+
+    Workers start engines without arguments, so the options are baked
+    into a temporary launcher script.
+
+    Yields:
+        str: Path to the launcher.
+    """
+    with TemporaryDirectory() as directory:
+        launcher = Path(directory) / "fake_uci"
+        launcher.write_text(
+            f'#!/bin/sh\nexec "{executable}" "{FAKE_UCI}" '
+            f"--delay {delay} --startup {startup}\n"
+        )
+        chmod(launcher, 0o755)
+        yield str(launcher)
@@ -0,0 +1,45 @@
+"""
+Per-position overhead of StockfishEngineWorker
+
+Runs a worker against the scripted UCI engine, which answers instantly,
+so the measured time is the cost of the worker's own round-trips.
+
+Usage:
+    python -m benchmarks.worker_latency [--positions N] [--depth N]
+"""
+
+from argparse import ArgumentParser
+from asyncio import run
+from time import perf_counter
+
+from src.engine.stockfish.worker import StockfishEngineWorker
+
+from .utils import GAME_FEN, GAME_MOVES, fake_engine
+
+
+async def benchmark(path: str, positions: int, depth: int) -> float:
+    worker = StockfishEngineWorker(path, depth, 1)
+    await worker.open()
+    before = perf_counter()
+    for index in range(positions):
+        await worker.position(GAME_FEN, GAME_MOVES[: index % len(GAME_MOVES)])
+        await worker.go()
+    elapsed = perf_counter() - before
+    await worker.close()
+    return elapsed / positions
+
+
+def main():
+    argument_parser = ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--positions", type=int, default=50)
+    argument_parser.add_argument("--depth", type=int, default=1)
+    args = argument_parser.parse_args()
+
+    with fake_engine() as path:
+        latency = run(benchmark(path, args.positions, args.depth))
+    print(f"positions: {args.positions}, depth: {args.depth}")
+    print(f"overhead per position: {latency * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from typing import Protocol, Iterable, Any
+from typing import Protocol, Iterable, AsyncIterable, AsyncIterator, Any, Sequence
 
 
 class Engine(Protocol):
@@ -11,17 +11,77 @@ class Engine(Protocol):
     """
 
     async def analyze(
-        self, initial_fen: str, uci_moves: Iterable[str]
+        self,
+        initial_fen: str,
+        uci_moves: list[str],
+        plies: Iterable[int] | None = None,
     ) -> Iterable[Any]:
         """
         Analyzes chess game
 
         Args:
             initial_fen (str)
-            uci_moves (Iterable[str])
+            uci_moves (list[str])
+            plies (Iterable[int] | None): Indices of positions to analyze, 0 is the initial position.
+                                          Defaults to all positions.
 
         Returns:
-            Iterable[Any]: Result of analyzed positions.
+            Iterable[Any]: Result of analyzed positions. None for positions that were not analyzed.
+
+        Raises:
+            TypeError
+            EngineError: If failed to run engine process; If failed to communicate with the engine process.
+        """
+        raise NotImplementedError
+
+    async def analyze_many(
+        self,
+        games: Sequence[
+            tuple[str, list[str]] | tuple[str, list[str], Iterable[int] | None]
+        ],
+    ) -> Iterable[Iterable[Any]]:
+        """
+        Analyzes batch of chess games
+
+        Positions of all games are analyzed as a single batch, which keeps
+        the engine busy until the last position of the last game.
+
+        Args:
+            games (Sequence[tuple[str, list[str]] | tuple[str, list[str], Iterable[int] | None]]):
+                Initial FEN, UCI moves and optionally indices of positions to analyze of each game.
+
+        Returns:
+            Iterable[Iterable[Any]]: Result of analyzed positions for each game, in order.
+
+        Raises:
+            TypeError
+            EngineError: If failed to run engine process; If failed to communicate with the engine process.
+        """
+        raise NotImplementedError
+
+    def analyze_stream(
+        self,
+        games: (
+            Iterable[
+                tuple[str, str, list[str]]
+                | tuple[str, str, list[str], Iterable[int] | None]
+            ]
+            | AsyncIterable[
+                tuple[str, str, list[str]]
+                | tuple[str, str, list[str], Iterable[int] | None]
+            ]
+        ),
+    ) -> AsyncIterator[tuple[str, int, Any]]:
+        """
+        Analyzes chess games, yielding positions as soon as they are analyzed
+
+        Args:
+            games (Iterable[tuple] | AsyncIterable[tuple]):
+                Game ID, initial FEN, UCI moves and optionally indices of positions to analyze of each game.
+
+        Yields:
+            tuple[str, int, Any]: Game ID, index of position in the game and result of analyzed position,
+                                  in order of completion.
 
         Raises:
             TypeError
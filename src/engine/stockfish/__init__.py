@@ -1 +1,8 @@
 from .stockfish import LocalStockfishEngine
+from .remote import RemoteStockfishEngine, StockfishEngineServer
+from .cache import AnalysisCache
+from .cutoff import Cutoff
+from ...models.info import InfoLine, parse_info_line
+from .scheduling import Scheduling
+from .search import Search
+from .triage import Triage, eval_swing_candidates
@@ -0,0 +1,184 @@
+from json import dumps, loads
+from sqlite3 import connect, Error as SQLiteError
+
+from ..error import EngineError
+from ...models.info import InfoLine, load_info_line
+
+
+class AnalysisCache:
+    """
+    Persistent Analysis Cache
+
+    Stores analysis lines in a SQLite database as JSON arrays of their fields,
+    keyed by position, depth and number of lines. Position is identified by FEN without move clocks, so the
+    same position reached in different games or move orders is analyzed once.
+    Entry analyzed deeper or with more lines satisfies shallower requests.
+    Least recently used entries are evicted once cache holds `max_entries`.
+
+    Args:
+        path (str): Path to database file, ":memory:" keeps cache in memory
+        max_entries (int)
+
+    Raises:
+        TypeError
+        ValueError
+        EngineError: If failed to open database.
+    """
+
+    def __init__(self, path: str, max_entries: int = 1_000_000):
+        if not isinstance(path, str) or not isinstance(max_entries, int):
+            raise TypeError("Invalid argument types")
+
+        if not path or max_entries < 1:
+            raise ValueError("Invalid argument values")
+
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        try:
+            self._connection = connect(path)
+            self._connection.executescript(
+                """
+                PRAGMA journal_mode = WAL;
+                PRAGMA synchronous = NORMAL;
+                CREATE TABLE IF NOT EXISTS analyses (
+                    fen TEXT NOT NULL,
+                    depth INTEGER NOT NULL,
+                    multipv INTEGER NOT NULL,
+                    lines TEXT NOT NULL,
+                    used INTEGER NOT NULL,
+                    PRIMARY KEY (fen, depth, multipv)
+                );
+                CREATE INDEX IF NOT EXISTS analyses_used ON analyses (used);
+                """
+            )
+            self._entries, self._clock = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(MAX(used), 0) FROM analyses"
+            ).fetchone()
+        except SQLiteError as e:
+            raise EngineError(e)
+
+    def get(self, fen: str, depth: int, multipv: int) -> list[InfoLine] | None:
+        """
+        Returns cached analysis lines
+
+        Args:
+            fen (str)
+            depth (int): Minimal depth of cached analysis.
+            multipv (int): Minimal number of cached lines.
+
+        Returns:
+            list[InfoLine] | None: First `multipv` lines. None if position is not cached.
+
+        Raises:
+            EngineError: If failed to query database.
+        """
+        try:
+            row = self._connection.execute(
+                "SELECT rowid, lines FROM analyses "
+                "WHERE fen = ? AND depth >= ? AND multipv >= ? "
+                "ORDER BY depth, multipv LIMIT 1",
+                (normalize_fen(fen), depth, multipv),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._clock += 1
+            self._connection.execute(
+                "UPDATE analyses SET used = ? WHERE rowid = ?", (self._clock, row[0])
+            )
+            self._connection.commit()
+        except SQLiteError as e:
+            raise EngineError(e)
+
+        lines: list[InfoLine] = []
+        for value in loads(row[1])[:multipv]:
+            line = load_info_line(value)
+            if line is None:
+                self.misses += 1
+                return None
+            lines.append(line)
+
+        self.hits += 1
+        return lines
+
+    def put(self, fen: str, depth: int, multipv: int, lines: list[InfoLine]) -> None:
+        """
+        Stores analysis lines
+
+        Args:
+            fen (str)
+            depth (int)
+            multipv (int)
+            lines (list[InfoLine])
+
+        Raises:
+            EngineError: If failed to write into database.
+        """
+        key = (normalize_fen(fen), depth, multipv)
+        self._clock += 1
+        try:
+            exists = self._connection.execute(
+                "SELECT 1 FROM analyses WHERE fen = ? AND depth = ? AND multipv = ?",
+                key,
+            ).fetchone()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO analyses (fen, depth, multipv, lines, used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (*key, dumps(lines), self._clock),
+            )
+            if exists is None:
+                self._entries += 1
+            if self._entries > self.max_entries:
+                self._evict(self._entries - self.max_entries)
+            self._connection.commit()
+        except SQLiteError as e:
+            raise EngineError(e)
+
+    def clear(self) -> None:
+        """
+        Removes all entries and resets counters
+
+        Raises:
+            EngineError: If failed to write into database.
+        """
+        try:
+            self._connection.execute("DELETE FROM analyses")
+            self._connection.commit()
+        except SQLiteError as e:
+            raise EngineError(e)
+        self._entries = 0
+        self.hits = 0
+        self.misses = 0
+
+    def close(self) -> None:
+        """Closes database"""
+        self._connection.close()
+
+    def __len__(self) -> int:
+        return self._entries
+
+    def __enter__(self) -> "AnalysisCache":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"AnalysisCache({self.path}, {self._entries}/{self.max_entries}, hits={self.hits}, misses={self.misses})"
+
+    def _evict(self, count: int) -> None:
+        self._connection.execute(
+            "DELETE FROM analyses WHERE rowid IN "
+            "(SELECT rowid FROM analyses ORDER BY used LIMIT ?)",
+            (count,),
+        )
+        self._entries -= count
+
+
+def normalize_fen(fen: str) -> str:
+    """Strips halfmove clock and fullmove number from FEN"""
+    return " ".join(fen.split(" ")[:4])
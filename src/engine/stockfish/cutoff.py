@@ -0,0 +1,46 @@
+from ...models.info import InfoLine
+
+
+class Cutoff:
+    """
+    Represents early stop of searches in decided positions
+
+    Search is stopped as soon as a completed depth shows forced mate or
+    evaluation outside of (-window, window) centipawns, and lines of that
+    depth are returned. Window should be wider than evaluations the puzzle
+    creator accepts, e.g. twice `AnalysisBasedPuzzleCreator.window`, as
+    lower depths are less accurate.
+
+    Args:
+        window (int): Evaluation in centipawns from which position is decided
+        depth (int): Minimal completed depth before the search can be stopped
+        mate (bool): Whether forced mate decides the position
+
+    Raises:
+        TypeError
+        ValueError
+    """
+
+    def __init__(self, window: int = 1000, depth: int = 10, mate: bool = True):
+        if (
+            not isinstance(window, int)
+            or not isinstance(depth, int)
+            or not isinstance(mate, bool)
+        ):
+            raise TypeError("Invalid argument types")
+
+        if window < 1 or depth < 1:
+            raise ValueError("Invalid argument values")
+
+        self.window = window
+        self.depth = depth
+        self.mate = mate
+
+    def decided(self, line: InfoLine) -> bool:
+        """Returns whether the best line shows decided position"""
+        if line.score_name == "mate":
+            return self.mate
+        return abs(line.score_value) >= self.window
+
+    def __repr__(self) -> str:
+        return f"Cutoff({self.window}, {self.depth}, {self.mate})"
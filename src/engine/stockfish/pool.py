@@ -0,0 +1,183 @@
+from subprocess import SubprocessError
+from asyncio import Queue, TaskGroup
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from ..error import EngineError
+from .worker import StockfishEngineWorker
+
+
+class StockfishEngineWorkerPool:
+    """
+    Stockfish Engine Worker Pool
+
+    Keeps Stockfish processes running between analyses, so the process start-up
+    and UCI handshake are paid once per pool instead of once per analyzed game.
+    Idle workers are handed out through a queue, dead workers are restarted
+    before they are handed out again.
+
+    Args:
+        path (str): Path to Stockfish engine executable
+        depth (int | None)
+        multipv (int): Number of best engine lines to return
+        size (int): Number of Stockfish processes running at the same time
+        options (dict[str, str | int | bool] | None): UCI options of every process
+
+    Raises:
+        TypeError
+        ValueError
+    """
+
+    def __init__(
+        self,
+        path: str,
+        depth: int | None,
+        multipv: int,
+        size: int,
+        options: dict[str, str | int | bool] | None = None,
+    ):
+        if (
+            not isinstance(path, str)
+            or not isinstance(depth, int | None)
+            or not isinstance(multipv, int)
+            or not isinstance(size, int)
+            or not isinstance(options, dict | None)
+        ):
+            raise TypeError("Invalid argument types")
+
+        if size < 1:
+            raise ValueError("Invalid argument values")
+
+        self.path = path
+        self.depth = depth
+        self.multipv = multipv
+        self.size = size
+        self.options = options
+        self._workers: list[StockfishEngineWorker] = []
+        self._idle: Queue[StockfishEngineWorker] = Queue()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self) -> None:
+        """
+        Opens all worker processes
+
+        Raises:
+            EngineError: If failed to run engine process.
+        """
+        if self.running:
+            return None
+
+        workers = [self._create_worker() for _ in range(self.size)]
+        try:
+            async with TaskGroup() as task_group:
+                for worker in workers:
+                    task_group.create_task(worker.open())
+        except ExceptionGroup as e:
+            for worker in workers:
+                await self._close_worker(worker)
+            raise EngineError(*e.exceptions) from e
+
+        self._workers = workers
+        for worker in workers:
+            self._idle.put_nowait(worker)
+
+    async def stop(self) -> None:
+        """Closes all worker processes"""
+        workers, self._workers = self._workers, []
+        self._idle = Queue()
+        for worker in workers:
+            await self._close_worker(worker)
+
+    async def acquire(self) -> StockfishEngineWorker:
+        """
+        Waits for an idle worker
+
+        Returns:
+            StockfishEngineWorker: Running worker, restarted if its process died.
+
+        Raises:
+            EngineError: If pool is not running; If failed to restart engine process.
+        """
+        if not self.running:
+            raise EngineError("Worker pool is not running")
+
+        worker = await self._idle.get()
+        if not worker.alive:
+            worker = await self._restart(worker)
+        return worker
+
+    async def release(
+        self, worker: StockfishEngineWorker, broken: bool = False
+    ) -> None:
+        """
+        Returns worker to the pool
+
+        Args:
+            worker (StockfishEngineWorker)
+            broken (bool): Whether worker failed. Broken worker is killed
+                           and restarted next time it is acquired.
+        """
+        if broken:
+            worker.kill()
+
+        if worker not in self._workers:
+            await self._close_worker(worker)
+            return None
+
+        self._idle.put_nowait(worker)
+
+    @asynccontextmanager
+    async def worker(self) -> AsyncIterator[StockfishEngineWorker]:
+        """
+        Acquires worker for the duration of the context
+
+        Worker is considered broken if the context exits with any error
+        other than invalid arguments, as its output can not be trusted anymore.
+
+        Raises:
+            EngineError: If pool is not running; If failed to restart engine process.
+        """
+        worker = await self.acquire()
+        try:
+            yield worker
+        except (TypeError, ValueError):
+            await self.release(worker)
+            raise
+        except BaseException:
+            await self.release(worker, broken=True)
+            raise
+        else:
+            await self.release(worker)
+
+    async def __aenter__(self) -> "StockfishEngineWorkerPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        await self.stop()
+
+    def _create_worker(self) -> StockfishEngineWorker:
+        return StockfishEngineWorker(self.path, self.depth, self.multipv, self.options)
+
+    async def _restart(self, worker: StockfishEngineWorker) -> StockfishEngineWorker:
+        await self._close_worker(worker)
+        replacement = self._create_worker()
+        self._workers[self._workers.index(worker)] = replacement
+        try:
+            await replacement.open()
+        except (SubprocessError, OSError) as e:
+            # Keep the slot, next acquire will try to restart it again
+            await self._close_worker(replacement)
+            self._idle.put_nowait(replacement)
+            raise EngineError(e)
+        return replacement
+
+    @staticmethod
+    async def _close_worker(worker: StockfishEngineWorker) -> None:
+        try:
+            await worker.close()
+        except (SubprocessError, OSError):
+            worker.kill()
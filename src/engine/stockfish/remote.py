@@ -0,0 +1,543 @@
+from asyncio import (
+    Lock,
+    Queue,
+    Semaphore,
+    Server,
+    StreamReader,
+    StreamWriter,
+    Task,
+    TaskGroup,
+    create_task,
+    current_task,
+    gather,
+    get_running_loop,
+    open_connection,
+    open_unix_connection,
+    start_server,
+    start_unix_server,
+    sleep,
+)
+from itertools import count
+from json import dumps, loads
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Sequence
+
+from ..error import EngineError
+from ...models.info import InfoLine, load_info_line
+from .stockfish import LocalStockfishEngine, GameInput
+
+
+# Remote protocol
+#
+# Client and server exchange newline delimited JSON messages over TCP or Unix
+# socket. Each request is a job analyzing positions of a single game:
+#   {"id": 1, "game": [initial_fen, uci_moves, plies | null]}
+# Server answers with a message per analyzed position, followed by
+# a final message, all tagged with the job id:
+#   {"id": 1, "ply": 0, "lines": [[InfoLine fields], ...]}
+#   {"id": 1, "done": true} or {"id": 1, "error": "..."}
+# Jobs are analyzed concurrently, so messages of different jobs interleave.
+
+
+class StockfishEngineServer:
+    """
+    Stockfish Engine Server
+
+    Serves analysis jobs of remote clients using local engine, whose worker
+    pool is shared by all connections.
+
+    Args:
+        engine (LocalStockfishEngine)
+        address (str): "host:port" for TCP or "unix:path" for Unix socket
+
+    Raises:
+        TypeError
+        ValueError
+    """
+
+    def __init__(self, engine: LocalStockfishEngine, address: str):
+        if not isinstance(engine, LocalStockfishEngine) or not isinstance(address, str):
+            raise TypeError("Invalid argument types")
+
+        parse_address(address)
+        self.engine = engine
+        self.address = address
+        self._server: Server | None = None
+        self._connections: set[Task] = set()
+        self._writers: set[StreamWriter] = set()
+
+    async def start(self) -> None:
+        """
+        Starts engine and starts listening for connections
+
+        Raises:
+            EngineError: If failed to run engine process; If failed to listen on address.
+        """
+        if self._server is not None:
+            return None
+
+        await self.engine.start()
+        host, port = parse_address(self.address)
+        try:
+            if port is None:
+                self._server = await start_unix_server(self._handle, host)
+            else:
+                self._server = await start_server(self._handle, host, port)
+        except OSError as e:
+            await self.engine.stop()
+            raise EngineError(e)
+
+    async def stop(self) -> None:
+        """Stops listening, closes connections and stops engine"""
+        server, self._server = self._server, None
+        if server is not None:
+            server.close()
+            for writer in self._writers:
+                writer.close()
+            await gather(*self._connections, return_exceptions=True)
+            await server.wait_closed()
+        await self.engine.stop()
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        assert self._server is not None
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def __aenter__(self) -> "StockfishEngineServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        await self.stop()
+
+    async def _handle(self, reader: StreamReader, writer: StreamWriter) -> None:
+        connection = current_task()
+        assert connection is not None
+        self._connections.add(connection)
+        connection.add_done_callback(self._connections.discard)
+        self._writers.add(writer)
+        lock = Lock()
+        jobs: set[Task] = set()
+
+        async def send(message: dict[str, Any]) -> None:
+            async with lock:
+                writer.write(dumps(message).encode() + b"\n")
+                await writer.drain()
+
+        async def run_job(job_id: Any, game: list[Any]) -> None:
+            try:
+                initial_fen, uci_moves, plies = game
+                async for _, index, lines in self.engine.analyze_stream(
+                    [(job_id, initial_fen, uci_moves, plies)]
+                ):
+                    await send({"id": job_id, "ply": index, "lines": lines})
+            except (TypeError, ValueError, EngineError) as e:
+                await send({"id": job_id, "error": repr(e)})
+            else:
+                await send({"id": job_id, "done": True})
+
+        try:
+            while line := await reader.readline():
+                try:
+                    request = loads(line)
+                    job = create_task(run_job(request["id"], request["game"]))
+                except (ValueError, KeyError, TypeError):
+                    break
+                jobs.add(job)
+                job.add_done_callback(jobs.discard)
+        except ConnectionError:
+            pass
+        finally:
+            for job in jobs:
+                job.cancel()
+            await gather(*jobs, return_exceptions=True)
+            self._writers.discard(writer)
+            writer.close()
+
+
+class RemoteStockfishEngine:
+    """
+    Remote Stockfish Engine
+
+    Distributes positions across Stockfish engine servers. Positions of every
+    game are split into a job per server, each sent to the server with the
+    fewest positions in progress. Jobs of a server that disconnects are
+    resumed on other servers, without positions that were already analyzed. Broken servers are reconnected on next use.
+    Depth, multipv and other analysis options are configured on servers.
+
+    Args:
+        addresses (list[str]): "host:port" for TCP or "unix:path" for Unix socket of each server
+        retries (int): How many times a job is resent after its server failed
+        reconnect_delay (float): Minimal delay between reconnection attempts in seconds
+
+    Raises:
+        TypeError
+        ValueError
+    """
+
+    def __init__(
+        self, addresses: list[str], retries: int = 3, reconnect_delay: float = 1.0
+    ):
+        if (
+            not isinstance(addresses, list)
+            or not all(isinstance(address, str) for address in addresses)
+            or not isinstance(retries, int)
+            or not isinstance(reconnect_delay, int | float)
+        ):
+            raise TypeError("Invalid argument types")
+
+        if not addresses or retries < 0 or reconnect_delay < 0:
+            raise ValueError("Invalid argument values")
+
+        for address in addresses:
+            parse_address(address)
+        self.addresses = addresses
+        self.retries = retries
+        self.reconnect_delay = reconnect_delay
+        self._connections = [
+            _Connection(address, reconnect_delay) for address in addresses
+        ]
+        self._job_ids = count()
+
+    async def start(self) -> None:
+        """
+        Connects to all servers
+
+        Raises:
+            EngineError: If failed to connect to any server.
+        """
+        await gather(*(connection.open() for connection in self._connections))
+        if not any(connection.connected for connection in self._connections):
+            raise EngineError("Failed to connect to any engine server")
+
+    async def stop(self) -> None:
+        """Disconnects from all servers"""
+        for connection in self._connections:
+            await connection.close()
+
+    async def __aenter__(self) -> "RemoteStockfishEngine":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        await self.stop()
+
+    async def analyze(
+        self,
+        initial_fen: str,
+        uci_moves: list[str],
+        plies: Iterable[int] | None = None,
+    ) -> list[list[InfoLine] | None]:
+        if (
+            not isinstance(initial_fen, str)
+            or not isinstance(uci_moves, list)
+            or not isinstance(plies, Iterable | None)
+        ):
+            raise TypeError("Invalid argument types")
+
+        return (await self.analyze_many([(initial_fen, uci_moves, plies)]))[0]
+
+    async def analyze_many(
+        self,
+        games: Sequence[
+            tuple[str, list[str]] | tuple[str, list[str], Iterable[int] | None]
+        ],
+    ) -> list[list[list[InfoLine] | None]]:
+        if not isinstance(games, Sequence) or not all(
+            isinstance(game, tuple)
+            and len(game) in (2, 3)
+            and isinstance(game[0], str)
+            and isinstance(game[1], list)
+            for game in games
+        ):
+            raise TypeError("Invalid argument types")
+
+        analyses: list[list[list[InfoLine] | None]] = [
+            [None] * (len(game[1]) + 1) for game in games
+        ]
+        async for game_id, index, lines in self.analyze_stream(
+            (str(game_index), game[0], game[1], game[2] if len(game) == 3 else None)
+            for game_index, game in enumerate(games)
+        ):
+            analyses[int(game_id)][index] = lines
+        return analyses
+
+    async def analyze_stream(
+        self,
+        games: Iterable[GameInput] | AsyncIterable[GameInput],
+    ) -> AsyncIterator[tuple[str, int, list[InfoLine]]]:
+        if not isinstance(games, Iterable | AsyncIterable):
+            raise TypeError("Invalid argument types")
+
+        results: Queue[tuple[str, int, list[InfoLine]] | Exception | None] = Queue(
+            maxsize=len(self._connections) * 16
+        )
+        # Limits number of jobs in flight to not read whole input ahead
+        slots = Semaphore(len(self._connections) * 4)
+
+        async def run_job(
+            game_id: str, initial_fen: str, uci_moves: list[str], plies: list[int]
+        ) -> None:
+            try:
+                remaining = set(plies)
+                attempts = 0
+                while remaining:
+                    connection = await self._pick()
+                    try:
+                        async for index, lines in connection.run(
+                            next(self._job_ids),
+                            [initial_fen, uci_moves, sorted(remaining)],
+                        ):
+                            remaining.discard(index)
+                            await results.put((game_id, index, lines))
+                        remaining.clear()
+                    # Only lost connections are retried, errors reported
+                    # by the server would repeat on any other
+                    except ConnectionError:
+                        if attempts == self.retries:
+                            raise
+                        attempts += 1
+            finally:
+                slots.release()
+
+        async def submit(task_group: TaskGroup, game: GameInput) -> None:
+            check_game(game)
+            game_id, initial_fen, uci_moves = game[:3]
+            plies = game[3] if len(game) == 4 else None
+            plies = sorted(
+                set(plies if plies is not None else range(len(uci_moves) + 1))
+            )
+            if plies and (plies[0] < 0 or plies[-1] > len(uci_moves)):
+                raise ValueError("Invalid argument values")
+            # Consecutive positions are split into a job per server,
+            # so that even a single game is analyzed by all servers
+            size = max(1, -(-len(plies) // len(self._connections)))
+            for start in range(0, len(plies), size):
+                await slots.acquire()
+                task_group.create_task(
+                    run_job(
+                        game_id, initial_fen, uci_moves, plies[start : start + size]
+                    )
+                )
+
+        async def produce(task_group: TaskGroup) -> None:
+            try:
+                if isinstance(games, AsyncIterable):
+                    async for game in games:
+                        await submit(task_group, game)
+                else:
+                    for game in games:
+                        await submit(task_group, game)
+            except Exception as e:
+                # Errors of the input, such as errors of fetching or parsing
+                # the games, are passed to the caller as they are
+                await results.put(e)
+
+        async def run() -> None:
+            try:
+                async with TaskGroup() as task_group:
+                    task_group.create_task(produce(task_group))
+            except ExceptionGroup as e:
+                error = EngineError(*e.exceptions)
+                error.__cause__ = e
+                await results.put(error)
+            else:
+                await results.put(None)
+
+        runner = create_task(run())
+        try:
+            while (result := await results.get()) is not None:
+                if isinstance(result, Exception):
+                    raise result
+                yield result
+        finally:
+            runner.cancel()
+            await gather(runner, return_exceptions=True)
+
+    async def _pick(self) -> "_Connection":
+        # Least loaded connected server, reconnecting broken ones if needed
+        for _ in range(self.retries + 1):
+            connected = [
+                connection for connection in self._connections if connection.connected
+            ]
+            if connected:
+                return min(connected, key=lambda connection: connection.load)
+
+            await gather(*(connection.open() for connection in self._connections))
+            if not any(connection.connected for connection in self._connections):
+                await sleep(self.reconnect_delay)
+        raise EngineError("Failed to connect to any engine server")
+
+
+class _Connection:
+    """Connection to a single engine server"""
+
+    def __init__(self, address: str, reconnect_delay: float):
+        self.address = address
+        self.reconnect_delay = reconnect_delay
+        # Number of positions in progress
+        self.load = 0
+        self._writer: StreamWriter | None = None
+        self._reader: Task | None = None
+        self._jobs: dict[int, Queue[dict[str, Any] | None]] = {}
+        self._lock = Lock()
+        self._failed_at: float | None = None
+
+    @property
+    def connected(self) -> bool:
+        return self._reader is not None and not self._reader.done()
+
+    async def open(self) -> None:
+        async with self._lock:
+            if self.connected:
+                return None
+
+            loop_time = _loop_time()
+            if (
+                self._failed_at is not None
+                and loop_time - self._failed_at < self.reconnect_delay
+            ):
+                return None
+
+            host, port = parse_address(self.address)
+            try:
+                if port is None:
+                    reader, writer = await open_unix_connection(host)
+                else:
+                    reader, writer = await open_connection(host, port)
+            except OSError:
+                self._failed_at = loop_time
+                return None
+
+            self._failed_at = None
+            self._writer = writer
+            self._reader = create_task(self._read(reader))
+
+    async def close(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            await gather(self._reader, return_exceptions=True)
+            self._reader = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    async def run(
+        self, job_id: int, game: list[Any]
+    ) -> AsyncIterator[tuple[int, list[InfoLine]]]:
+        """
+        Sends job and yields its analyzed positions
+
+        Raises:
+            ConnectionError: If connection broke before job was finished.
+            EngineError: If server failed to analyze the game.
+        """
+        if not self.connected or self._writer is None:
+            raise ConnectionError("Not connected")
+
+        messages: Queue[dict[str, Any] | None] = Queue()
+        self._jobs[job_id] = messages
+        positions = len(game[2])
+        self.load += positions
+        try:
+            self._writer.write(dumps({"id": job_id, "game": game}).encode() + b"\n")
+            await self._writer.drain()
+            while (message := await messages.get()) is not None:
+                if "error" in message:
+                    raise EngineError(message["error"])
+                if message.get("done"):
+                    return
+                self.load -= 1
+                positions -= 1
+                lines: list[InfoLine] = []
+                for value in message["lines"]:
+                    line = load_info_line(value)
+                    if line is None:
+                        raise EngineError("Invalid analysis line")
+                    lines.append(line)
+                yield message["ply"], lines
+            raise ConnectionError(f"Connection to {self.address} was lost")
+        finally:
+            self.load -= positions
+            self._jobs.pop(job_id, None)
+
+    async def _read(self, reader: StreamReader) -> None:
+        try:
+            while line := await reader.readline():
+                message = loads(line)
+                messages = self._jobs.get(message.get("id"))
+                if messages is not None:
+                    messages.put_nowait(message)
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            self._failed_at = _loop_time()
+            for messages in self._jobs.values():
+                messages.put_nowait(None)
+            if self._writer is not None:
+                self._writer.close()
+
+
+def parse_address(address: str) -> tuple[str, int | None]:
+    """
+    Parses server address
+
+    Args:
+        address (str): "host:port" for TCP or "unix:path" for Unix socket.
+
+    Returns:
+        tuple[str, int | None]: Host and port, or socket path and None.
+
+    Raises:
+        ValueError
+    """
+    if address.startswith("unix:"):
+        path = address.removeprefix("unix:")
+        if not path:
+            raise ValueError("Invalid address", address)
+        return path, None
+
+    host, _, port = address.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError("Invalid address", address)
+    return host, int(port)
+
+
+def check_game(game: Any) -> None:
+    if (
+        not isinstance(game, tuple)
+        or len(game) not in (3, 4)
+        or not isinstance(game[1], str)
+        or not isinstance(game[2], list)
+        or not isinstance(game[3] if len(game) == 4 else None, Iterable | None)
+    ):
+        raise TypeError("Invalid argument types")
+
+
+def _loop_time() -> float:
+    return get_running_loop().time()
+
+
+async def main():
+    from argparse import ArgumentParser
+
+    argument_parser = ArgumentParser(description="Runs Stockfish engine server")
+    argument_parser.add_argument("address", help='"host:port" or "unix:path"')
+    argument_parser.add_argument("--engine", default="stockfish")
+    argument_parser.add_argument("--depth", type=int, default=None)
+    argument_parser.add_argument("--multipv", type=int, default=None)
+    argument_parser.add_argument("--workers", type=int, default=None)
+    args = argument_parser.parse_args()
+
+    engine = LocalStockfishEngine(args.engine, args.depth, args.multipv, args.workers)
+    server = StockfishEngineServer(engine, args.address)
+    print(f"Serving on {args.address}")
+    await server.serve_forever()
+
+
+if __name__ == "__main__":
+    from asyncio import run
+
+    run(main())
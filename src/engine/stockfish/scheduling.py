@@ -0,0 +1,49 @@
+from enum import Enum
+
+
+class Scheduling(Enum):
+    """
+    Represents how game positions are assigned to engine workers
+
+    SHARED: Every position is taken by whichever worker is idle.
+    SEGMENTED: Game is split into contiguous segments of positions, each
+               analyzed in order by a single worker, so engine's hash table
+               filled by one position is reused by the next one.
+    """
+
+    SHARED = "shared"
+    SEGMENTED = "segmented"
+
+
+def schedule(
+    indices: list[int], scheduling: Scheduling, segments: int, backwards: bool
+) -> list[list[int]]:
+    """
+    Splits position indices into units of work
+
+    Args:
+        indices (list[int]): Indices of positions to analyze in game order.
+        scheduling (Scheduling)
+        segments (int): Maximal number of segments.
+        backwards (bool): Whether segments are analyzed from the last position.
+
+    Returns:
+        list[list[int]]: Units of work, each analyzed in order by a single worker.
+    """
+    if not indices:
+        return []
+
+    if scheduling == Scheduling.SHARED:
+        units = [[index] for index in indices]
+    else:
+        segments = max(1, min(segments, len(indices)))
+        size, remainder = divmod(len(indices), segments)
+        units, start = [], 0
+        for segment in range(segments):
+            end = start + size + (1 if segment < remainder else 0)
+            units.append(indices[start:end])
+            start = end
+
+    if backwards:
+        units = [unit[::-1] for unit in reversed(units)]
+    return units
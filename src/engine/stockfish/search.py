@@ -0,0 +1,62 @@
+from .cutoff import Cutoff
+
+
+class Search:
+    """
+    Represents limits of a single position search
+
+    Search stops as soon as any of the given limits is reached,
+    at least one limit is required.
+
+    Args:
+        depth (int | None)
+        multipv (int): Number of best engine lines to return
+        cutoff (Cutoff | None): Stops the search early in decided positions
+        movetime (int | None): Search time in milliseconds
+        nodes (int | None): Number of searched nodes
+
+    Raises:
+        TypeError
+        ValueError
+    """
+
+    def __init__(
+        self,
+        depth: int | None,
+        multipv: int,
+        cutoff: Cutoff | None = None,
+        movetime: int | None = None,
+        nodes: int | None = None,
+    ):
+        if (
+            not isinstance(depth, int | None)
+            or not isinstance(multipv, int)
+            or not isinstance(cutoff, Cutoff | None)
+            or not isinstance(movetime, int | None)
+            or not isinstance(nodes, int | None)
+        ):
+            raise TypeError("Invalid argument types")
+
+        limits = [limit for limit in (depth, movetime, nodes) if limit is not None]
+        if not limits or any(limit < 1 for limit in limits) or multipv < 1:
+            raise ValueError("Invalid argument values")
+
+        self.depth = depth
+        self.multipv = multipv
+        self.cutoff = cutoff
+        self.movetime = movetime
+        self.nodes = nodes
+
+    def command(self) -> str:
+        """Returns UCI go command"""
+        command = "go"
+        if self.depth is not None:
+            command += f" depth {self.depth}"
+        if self.movetime is not None:
+            command += f" movetime {self.movetime}"
+        if self.nodes is not None:
+            command += f" nodes {self.nodes}"
+        return command + "\n"
+
+    def __repr__(self) -> str:
+        return f"Search({self.depth}, {self.multipv}, {self.cutoff}, {self.movetime}, {self.nodes})"
@@ -1,25 +1,66 @@
 from subprocess import SubprocessError
-from typing import Any
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Sequence
 from os import cpu_count
-from queue import SimpleQueue
-from asyncio import TaskGroup
+from time import perf_counter
+from asyncio import Queue, Semaphore, TaskGroup, create_task, gather
+from contextlib import asynccontextmanager
 
+from ...chess import ChessPy, ChessError
 from ..error import EngineError
-from .worker import StockfishEngineWorker
+from .cache import AnalysisCache
+from .cutoff import Cutoff
+from .pool import StockfishEngineWorkerPool
+from .scheduling import Scheduling, schedule
+from ...models.info import InfoLine
+from .search import Search
+from .triage import Triage
+
+
+# How many times a position is retried on a restarted worker after engine crash
+MAX_RETRIES = 2
+
+# Game ID, initial FEN, UCI moves and optionally indices of positions to analyze
+GameInput = (
+    tuple[str, str, list[str]] | tuple[str, str, list[str], Iterable[int] | None]
+)
 
 
 class LocalStockfishEngine:
     """
     Local Stockfish Engine
 
+    Engine can be used as an async context manager (or started and stopped
+    explicitly) to keep its Stockfish processes running between analyses.
+    Engine that was not started runs its own processes for each analysis.
+
+    Searches are limited by depth, time or number of nodes, whichever is
+    reached first. Depth defaults to 18 only if no other limit is given.
+    Game time budget is shared fairly by game's positions, time left
+    over by positions finished early goes to the remaining ones. First pass
+    of depthless triage is limited by the budget too.
+
     Args:
         path (str): Path to Stockfish engine executable
-        depth (int)
+        depth (int | None)
         multipv (int): Number of best engine lines to return
         max_workers (int): Number of Stockfish processes running at the same time
+        threads (int | None): Number of search threads of each Stockfish process
+        hash_size (int | None): Size of hash table of each Stockfish process in MB
+        options (dict[str, str | int | bool] | None): Other UCI options of each Stockfish process
+        cache (AnalysisCache | None): Cache consulted before analyzing positions
+        scheduling (Scheduling | None): How positions are assigned to workers. Defaults to shared.
+        backwards (bool): Whether positions are analyzed from the end of the game
+        triage (Triage | None): Searches every position shallowly first and only
+                                candidate positions with full depth and multipv.
+                                Triage without depth makes only multipv adaptive.
+        cutoff (Cutoff | None): Stops full depth searches early in decided positions
+        movetime (int | None): Time of each position search in milliseconds
+        nodes (int | None): Number of nodes of each position search
+        game_time (int | None): Total time of full searches of each game in milliseconds
 
     Raises:
         TypeError
+        ValueError
     """
 
     def __init__(
@@ -28,68 +69,504 @@ class LocalStockfishEngine:
         depth: int | None = None,
         multipv: int | None = None,
         max_workers: int | None = None,
+        threads: int | None = None,
+        hash_size: int | None = None,
+        options: dict[str, str | int | bool] | None = None,
+        cache: AnalysisCache | None = None,
+        scheduling: Scheduling | None = None,
+        backwards: bool = False,
+        triage: Triage | None = None,
+        cutoff: Cutoff | None = None,
+        movetime: int | None = None,
+        nodes: int | None = None,
+        game_time: int | None = None,
     ):
         if (
             not isinstance(path, str)
             or not isinstance(depth, int | None)
             or not isinstance(multipv, int | None)
             or not isinstance(max_workers, int | None)
+            or not isinstance(threads, int | None)
+            or not isinstance(hash_size, int | None)
+            or not isinstance(options, dict | None)
+            or not isinstance(cache, AnalysisCache | None)
+            or not isinstance(scheduling, Scheduling | None)
+            or not isinstance(backwards, bool)
+            or not isinstance(triage, Triage | None)
+            or not isinstance(cutoff, Cutoff | None)
+            or not isinstance(movetime, int | None)
+            or not isinstance(nodes, int | None)
+            or not isinstance(game_time, int | None)
         ):
             raise TypeError("Invalid argument types")
 
-        if depth is None:
+        if any(
+            limit is not None and limit < 1
+            for limit in (max_workers, threads, hash_size, movetime, nodes, game_time)
+        ):
+            raise ValueError("Invalid argument values")
+
+        if depth is None and movetime is None and nodes is None and game_time is None:
             depth = 18
         if multipv is None:
             multipv = 3
         if max_workers is None:
-            threads = cpu_count()
-            max_workers = max(1, threads - 2) if threads is not None else 1
+            cpus = cpu_count()
+            max_workers = max(1, cpus - 2) if cpus is not None else 1
+        if scheduling is None:
+            scheduling = Scheduling.SHARED
 
         self.path = path
         self.depth = depth
         self.multipv = multipv
         self.max_workers = max_workers
+        self.threads = threads
+        self.hash_size = hash_size
+        self.options = options if options is not None else {}
+        self.cache = cache
+        self.scheduling = scheduling
+        self.backwards = backwards
+        self.triage = triage
+        self.cutoff = cutoff
+        self.movetime = movetime
+        self.nodes = nodes
+        self.game_time = game_time
+        self._pool: StockfishEngineWorkerPool | None = None
+
+    async def start(self) -> None:
+        """
+        Starts Stockfish processes
 
-    async def analyze(self, initial_fen: str, uci_moves: list[str]) -> list[list[str]]:
-        if not isinstance(initial_fen, str) or not isinstance(uci_moves, list):
+        Raises:
+            EngineError: If failed to run engine process.
+        """
+        if self._pool is not None:
+            return None
+
+        pool = self._create_pool()
+        await pool.start()
+        self._pool = pool
+
+    async def stop(self) -> None:
+        """Stops Stockfish processes"""
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            await pool.stop()
+
+    async def __aenter__(self) -> "LocalStockfishEngine":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        await self.stop()
+
+    async def analyze(
+        self,
+        initial_fen: str,
+        uci_moves: list[str],
+        plies: Iterable[int] | None = None,
+    ) -> list[list[InfoLine] | None]:
+        if (
+            not isinstance(initial_fen, str)
+            or not isinstance(uci_moves, list)
+            or not isinstance(plies, Iterable | None)
+        ):
             raise TypeError("Invalid argument types")
 
-        input_queue = SimpleQueue()
-        analyses: list[Any] = [None] * (len(uci_moves) + 1)
+        return (await self.analyze_many([(initial_fen, uci_moves, plies)]))[0]
 
-        input_queue.put((0, [""]))
-        for index in range(1, len(uci_moves) + 1):
-            input_queue.put((index, uci_moves[:index]))
+    async def analyze_many(
+        self,
+        games: Sequence[
+            tuple[str, list[str]] | tuple[str, list[str], Iterable[int] | None]
+        ],
+    ) -> list[list[list[InfoLine] | None]]:
+        if not isinstance(games, Sequence) or not all(
+            isinstance(game, tuple)
+            and len(game) in (2, 3)
+            and isinstance(game[0], str)
+            and isinstance(game[1], list)
+            for game in games
+        ):
+            raise TypeError("Invalid argument types")
 
-        async def run_worker() -> None:
-            worker = StockfishEngineWorker(self.path, self.depth, self.multipv)
+        analyses: list[list[Any]] = [[None] * (len(game[1]) + 1) for game in games]
+        async with self._session() as pool:
+            async for game_index, index, lines in self._stream(
+                pool, [(game_index, *game) for game_index, game in enumerate(games)]
+            ):
+                analyses[game_index][index] = lines
+        return analyses
 
-            await worker.open()
-            while not input_queue.empty():
-                index, moves = input_queue.get()
-                await worker.position(initial_fen, moves)
-                analysis = await worker.go()
-                analyses[index] = analysis
-            await worker.close()
+    async def analyze_stream(
+        self,
+        games: Iterable[GameInput] | AsyncIterable[GameInput],
+    ) -> AsyncIterator[tuple[str, int, list[InfoLine]]]:
+        if not isinstance(games, Iterable | AsyncIterable):
+            raise TypeError("Invalid argument types")
+
+        async with self._session() as pool:
+            async for result in self._stream(pool, games):
+                yield result
+
+    @asynccontextmanager
+    async def _session(self) -> AsyncIterator[StockfishEngineWorkerPool]:
+        # Engine that was not started gets its own pool for a single analysis
+        if self._pool is not None:
+            yield self._pool
+            return
+
+        async with self._create_pool() as pool:
+            yield pool
+
+    def _create_pool(self) -> StockfishEngineWorkerPool:
+        options: dict[str, str | int | bool] = {}
+        if self.threads is not None:
+            options["Threads"] = self.threads
+        if self.hash_size is not None:
+            options["Hash"] = self.hash_size
+        options.update(self.options)
+        return StockfishEngineWorkerPool(
+            self.path, self.depth, self.multipv, self.max_workers, options
+        )
+
+    async def _stream(
+        self,
+        pool: StockfishEngineWorkerPool,
+        games: Iterable[tuple[Any, ...]] | AsyncIterable[tuple[Any, ...]],
+    ) -> AsyncIterator[tuple[Any, int, list[InfoLine]]]:
+        # Positions of all games share one queue, so workers stay busy
+        # until the whole batch is analyzed. Results are yielded in order
+        # of completion, each as soon as its final search is done.
+        # Games are (game_id, initial_fen, uci_moves[, plies]) tuples, positions
+        # outside of plies are not analyzed at all.
+        units: Queue[tuple[_GameAnalysis, list[int]] | None] = Queue()
+        results: Queue[tuple[Any, int, list[InfoLine]] | Exception | None]
+        results = Queue(maxsize=self.max_workers * 4)
+        # Limits number of games in flight to not read whole input ahead
+        slots = Semaphore(self.max_workers * 2)
+        cache = self.cache
+        triage = self.triage
+        game_time = self.game_time
+        # Position never gets more time than the whole game budget
+        full_search = Search(
+            self.depth,
+            self.multipv,
+            self.cutoff,
+            self.movetime if self.movetime is not None else game_time,
+            self.nodes,
+        )
+        shallow_search = None
+        if triage is not None and triage.depth is not None:
+            shallow_search = Search(triage.depth, 1)
+        elif triage is not None:
+            # First pass has full limits, candidates only get more lines
+            shallow_search = Search(
+                full_search.depth,
+                1,
+                full_search.cutoff,
+                full_search.movetime,
+                full_search.nodes,
+            )
+        # First pass of depthless triage has full limits, so it is limited
+        # by game's time budget too
+        shallow_budgeted = triage is not None and triage.depth is None
+        in_flight = 0
+        produced = False
+
+        def stop_workers() -> None:
+            for _ in range(self.max_workers):
+                units.put_nowait(None)
+
+        def cached(
+            game: _GameAnalysis, index: int, search: Search
+        ) -> list[InfoLine] | None:
+            # Time and nodes limited searches reach unknown depth
+            if cache is None or game.fens is None or search.depth is None:
+                return None
+            return cache.get(game.fens[index], search.depth, search.multipv)
+
+        async def emit(game: _GameAnalysis, index: int) -> None:
+            await results.put((game.game_id, index, game.lines[index]))
+
+        async def start_game(item: Any) -> None:
+            nonlocal in_flight
+            if (
+                not isinstance(item, tuple)
+                or len(item) not in (3, 4)
+                or not isinstance(item[1], str)
+                or not isinstance(item[2], list)
+                or not isinstance(item[3] if len(item) == 4 else None, Iterable | None)
+            ):
+                raise TypeError("Invalid argument types")
+
+            game_id, initial_fen, uci_moves = item[:3]
+            plies = item[3] if len(item) == 4 else None
+            if plies is None:
+                plies = range(len(uci_moves) + 1)
+            plies = sorted(set(plies))
+            if plies and (plies[0] < 0 or plies[-1] > len(uci_moves)):
+                raise ValueError("Invalid argument values")
+
+            await slots.acquire()
+            in_flight += 1
+            game = _GameAnalysis(
+                game_id,
+                initial_fen,
+                uci_moves,
+                plies,
+                position_fens(initial_fen, uci_moves) if cache is not None else None,
+                game_time,
+            )
+
+            indices: list[int] = []
+            for index in plies:
+                lines = cached(game, index, full_search)
+                if lines is not None:
+                    game.lines[index] = lines
+                    game.final.add(index)
+                    await emit(game, index)
+                    continue
+                if shallow_search is not None:
+                    lines = cached(game, index, shallow_search)
+                    if lines is not None:
+                        game.lines[index] = lines
+                        continue
+                indices.append(index)
+
+            await start_pass(game, indices, shallow_search or full_search)
+
+        async def start_pass(
+            game: _GameAnalysis, indices: list[int], search: Search
+        ) -> None:
+            game.search = search
+            game.pending = len(indices)
+            if search is full_search:
+                game.unstarted = len(indices)
+            elif shallow_budgeted:
+                # Positions of first pass get shares as if all of them were
+                # searched fully too, time left is shared by the candidates
+                game.unstarted = 2 * len(indices)
+            if not indices:
+                await finish_pass(game)
+                return None
+
+            for unit in schedule(
+                indices, self.scheduling, self.max_workers, self.backwards
+            ):
+                units.put_nowait((game, unit))
+
+        async def finish_pass(game: _GameAnalysis) -> None:
+            nonlocal in_flight
+            if triage is not None and game.search is shallow_search:
+                candidates = set(triage.predicate(game.lines))
+                if triage.successors:
+                    candidates |= {index + 1 for index in candidates}
+                deep = [
+                    index
+                    for index in game.plies
+                    if index in candidates and index not in game.final
+                ]
+                for index in game.plies:
+                    if index not in candidates and index not in game.final:
+                        game.final.add(index)
+                        await emit(game, index)
+                if deep:
+                    await start_pass(game, deep, full_search)
+                    return None
+
+            in_flight -= 1
+            slots.release()
+            if produced and in_flight == 0:
+                stop_workers()
+
+        async def produce() -> None:
+            nonlocal produced
+            starting = False
+            try:
+                if isinstance(games, AsyncIterable):
+                    async for item in games:
+                        starting = True
+                        await start_game(item)
+                        starting = False
+                else:
+                    for item in games:
+                        starting = True
+                        await start_game(item)
+                        starting = False
+            except Exception as e:
+                # Errors of the input, such as errors of fetching or parsing
+                # the games, are passed to the caller as they are
+                if starting and not isinstance(e, TypeError | ValueError):
+                    raise
+                await results.put(e)
+            finally:
+                produced = True
+                if in_flight == 0:
+                    stop_workers()
+
+        async def analyze_unit(game: _GameAnalysis, unit: list[int]) -> None:
+            # Positions of a unit stay on one worker, unless it crashes
+            search = game.search
+            assert search is not None
+            position, retries = 0, 0
+            while position < len(unit):
+                try:
+                    async with pool.worker() as worker:
+                        while position < len(unit):
+                            index = unit[position]
+                            moves = game.uci_moves[:index] if index else [""]
+                            await worker.position(game.initial_fen, moves)
+                            if game.budget is not None and (
+                                search is full_search or shallow_budgeted
+                            ):
+                                lines = await budgeted_go(worker, game, search)
+                            else:
+                                lines = await worker.go(search)
+                            game.lines[index] = lines
+                            # Search stopped early is cached with the depth
+                            # it reached
+                            depth = lines[0].depth if lines else search.depth
+                            if (
+                                cache is not None
+                                and game.fens is not None
+                                and depth is not None
+                            ):
+                                cache.put(
+                                    game.fens[index], depth, search.multipv, lines
+                                )
+                            if search is full_search:
+                                game.final.add(index)
+                                await emit(game, index)
+                            position += 1
+                except (SubprocessError, OSError):
+                    if retries == MAX_RETRIES:
+                        raise
+                    retries += 1
+
+            game.pending -= len(unit)
+            if game.pending == 0:
+                await finish_pass(game)
+
+        async def budgeted_go(
+            worker: Any, game: _GameAnalysis, search: Search
+        ) -> list[InfoLine]:
+            # Position gets equal share of time left for game's unstarted
+            # positions, unused part of the share is returned to the game
+            share = game.reserve()
+            started = perf_counter()
+            try:
+                return await worker.go(
+                    Search(
+                        search.depth,
+                        search.multipv,
+                        search.cutoff,
+                        max(1, int(min(share, search.movetime or share))),
+                        search.nodes,
+                    )
+                )
+            except BaseException:
+                game.unstarted += 1
+                raise
+            finally:
+                game.settle(share, (perf_counter() - started) * 1000)
+
+        async def run_worker() -> None:
+            while (unit := await units.get()) is not None:
+                await analyze_unit(*unit)
 
             return None
 
+        async def run() -> None:
+            try:
+                async with TaskGroup() as task_group:
+                    task_group.create_task(produce())
+                    for _ in range(self.max_workers):
+                        task_group.create_task(run_worker())
+            except ExceptionGroup as e:
+                error = EngineError(*e.exceptions)
+                error.__cause__ = e
+                await results.put(error)
+            else:
+                await results.put(None)
+
+        runner = create_task(run())
         try:
-            async with TaskGroup() as task_group:
-                for _ in range(self.max_workers):
-                    task_group.create_task(run_worker())
-        except SubprocessError as e:
-            raise EngineError(e)
+            while (result := await results.get()) is not None:
+                if isinstance(result, Exception):
+                    raise result
+                yield result
+        finally:
+            runner.cancel()
+            await gather(runner, return_exceptions=True)
 
-        return analyses
 
+class _GameAnalysis:
+    """Progress of a single game analysis"""
 
-# class RemoteStockfishEngine: ...  # TODO
+    def __init__(
+        self,
+        game_id: Any,
+        initial_fen: str,
+        uci_moves: list[str],
+        plies: list[int],
+        fens: list[str] | None,
+        budget: int | None = None,
+    ):
+        self.game_id = game_id
+        self.initial_fen = initial_fen
+        self.uci_moves = uci_moves
+        # Positions to analyze, other positions stay None
+        self.plies = plies
+        self.fens = fens
+        self.lines: list[Any] = [None] * (len(uci_moves) + 1)
+        # Positions whose lines will not change anymore
+        self.final: set[int] = set()
+        self.search: Search | None = None
+        # Positions of current pass that are not analyzed yet
+        self.pending = 0
+        # Time left for budgeted searches in milliseconds
+        self.budget: float | None = budget
+        # Shares of the budget that were not reserved yet
+        self.unstarted = 0
+
+    def reserve(self) -> float:
+        """Reserves time of next position search"""
+        assert self.budget is not None
+        share = self.budget / max(1, self.unstarted)
+        self.budget -= share
+        self.unstarted -= 1
+        return share
+
+    def settle(self, share: float, elapsed: float) -> None:
+        """Returns unused time of position search"""
+        assert self.budget is not None
+        self.budget += share - elapsed
+
+
+def position_fens(initial_fen: str, uci_moves: list[str]) -> list[str] | None:
+    """
+    Returns FENs of all positions in the game
+
+    Returns:
+        list[str] | None: FEN for each prefix of moves. None if any move is illegal.
+    """
+    chessboard = ChessPy()
+    try:
+        chessboard.from_fen(initial_fen)
+        fens = [chessboard.to_fen()]
+        for uci_move in uci_moves:
+            chessboard.move(uci_move)
+            fens.append(chessboard.to_fen())
+    except ChessError:
+        return None
+    return fens
 
 
 async def main():
     engine = LocalStockfishEngine("stockfish", 16, 1, 10)
     print(engine.__dict__)
+    await engine.start()
     before = perf_counter()
     # fmt: off
     analyses = await engine.analyze(
@@ -103,6 +580,7 @@ async def main():
     )
     # fmt: on
     print("\n\nTime: ", perf_counter() - before)
+    await engine.stop()
 
 
 if __name__ == "__main__":
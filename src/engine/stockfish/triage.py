@@ -0,0 +1,92 @@
+from typing import Callable, Iterable
+
+from ...models.info import InfoLine
+
+
+# Picks indices of candidate positions from shallow analysis of the whole game,
+# positions that were not analyzed are None
+CandidatePredicate = Callable[[list[list[InfoLine] | None]], Iterable[int]]
+
+
+class Triage:
+    """
+    Represents two-pass analysis
+
+    Every position is first searched at low depth with a single line. Positions
+    picked by the predicate, and optionally the positions right after them,
+    are then searched again with engine's full depth and multipv.
+    Results of the other positions come from the shallow pass.
+
+    Without depth, the first pass uses engine's full limits with a single line,
+    so only multipv is adaptive: alternative lines, which cost Stockfish a large
+    part of its speed, are searched just for candidate positions, while
+    evaluations of all positions stay as accurate as without triage.
+
+    Args:
+        depth (int | None): Depth of the shallow pass. None for engine's full limits
+        predicate (CandidatePredicate | None): Defaults to `eval_swing_candidates()`.
+        successors (bool): Whether positions after candidates are searched fully too
+
+    Raises:
+        TypeError
+        ValueError
+    """
+
+    def __init__(
+        self,
+        depth: int | None = 10,
+        predicate: CandidatePredicate | None = None,
+        successors: bool = True,
+    ):
+        if (
+            not isinstance(depth, int | None)
+            or not (predicate is None or callable(predicate))
+            or not isinstance(successors, bool)
+        ):
+            raise TypeError("Invalid argument types")
+
+        if depth is not None and depth < 1:
+            raise ValueError("Invalid argument values")
+
+        self.depth = depth
+        self.predicate = predicate if predicate is not None else eval_swing_candidates()
+        self.successors = successors
+
+    def __repr__(self) -> str:
+        return f"Triage({self.depth}, {self.predicate}, {self.successors})"
+
+
+def eval_swing_candidates(threshold: int = 50, window: int = 600) -> CandidatePredicate:
+    """
+    Creates predicate picking positions followed by a large evaluation swing
+
+    Mirrors rules of `AnalysisBasedPuzzleCreator` with looser limits,
+    as shallow evaluations are less accurate.
+
+    Args:
+        threshold (int): Minimal swing in centipawns.
+        window (int): Evaluation after the swing has to be within (-window, window) centipawns.
+
+    Returns:
+        CandidatePredicate
+    """
+
+    def predicate(analyses: list[list[InfoLine] | None]) -> list[int]:
+        best = [lines[0] if lines else None for lines in analyses]
+        candidates: list[int] = []
+        for i in range(len(best) - 1):
+            line, next_line = best[i], best[i + 1]
+            if line is None or next_line is None:
+                continue
+            if line.score_name == "cp" and next_line.score_name == "cp":
+                if (
+                    -window < next_line.score_value < window
+                    and abs(next_line.score_value) - abs(line.score_value) > threshold
+                ):
+                    candidates.append(i)
+            elif line.score_name != next_line.score_name:
+                # Mate appeared or disappeared, deeper search decides
+                candidates.append(i)
+        return candidates
+
+    return predicate
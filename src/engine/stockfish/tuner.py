@@ -0,0 +1,187 @@
+from json import dump, load
+from os import cpu_count
+from time import perf_counter
+
+from .stockfish import LocalStockfishEngine
+
+
+# Positions of a typical middlegame-heavy game, analyzed by every configuration
+TUNING_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+# fmt: off
+TUNING_MOVES = [
+    "e2e4", "e7e6", "d2d4", "a7a6", "a2a3", "d7d5", "b1c3", "d5e4", "c3e4", "h7h6", "g1f3", "f8e7", "c1f4", "g8f6", "f1d3",
+    "b7b5", "e1g1", "c8b7", "f1e1", "b8d7", "d1d2", "c7c5", "c2c3", "c5c4", "d3c2", "d7b6", "a1d1", "b6d5", "f4g3", "f6h5",
+    "f3e5", "d5f6", "d2e2", "d8d5", "f2f3", "h5g3", "h2g3", "d5d8", "g1f2", "f6e4", "c2e4", "b7e4", "e2e4", "e8g8", "e1h1",
+    "e7f6", "e5g4", "d8e7", "g4h6", "g7h6", "h1h6", "f8d8", "d1h1", "a8c8", "h6h8", "f6h8", "e4h7", "g8f8", "h7h8",
+]
+# fmt: on
+
+
+class TuningResult:
+    """
+    Represents measured engine configuration
+
+    Raises:
+        TypeError
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        threads: int,
+        hash_size: int,
+        positions: int,
+        wall_time: float,
+    ):
+        if (
+            not isinstance(max_workers, int)
+            or not isinstance(threads, int)
+            or not isinstance(hash_size, int)
+            or not isinstance(positions, int)
+            or not isinstance(wall_time, float)
+        ):
+            raise TypeError("Invalid argument types")
+
+        self.max_workers = max_workers
+        self.threads = threads
+        self.hash_size = hash_size
+        self.positions = positions
+        self.wall_time = wall_time
+
+    @property
+    def positions_per_second(self) -> float:
+        return self.positions / self.wall_time if self.wall_time else 0.0
+
+    def config(self) -> dict[str, int]:
+        """Returns configuration as `LocalStockfishEngine` keyword arguments"""
+        return {
+            "max_workers": self.max_workers,
+            "threads": self.threads,
+            "hash_size": self.hash_size,
+        }
+
+    def __repr__(self) -> str:
+        return f"TuningResult({self.max_workers}, {self.threads}, {self.hash_size}, {self.positions}, {self.wall_time})"
+
+
+def combinations(cores: int, hash_total: int) -> list[tuple[int, int, int]]:
+    """
+    Returns configurations using all cores and the whole hash budget
+
+    Args:
+        cores (int): Number of cores available to the engine.
+        hash_total (int): Hash budget shared by all processes in MB.
+
+    Returns:
+        list[tuple[int, int, int]]: Number of processes, threads per process and hash per process in MB.
+    """
+    result: list[tuple[int, int, int]] = []
+    workers = 1
+    while workers <= cores:
+        result.append((workers, cores // workers, max(1, hash_total // workers)))
+        workers *= 2
+    if result[-1][0] != cores:
+        result.append((cores, 1, max(1, hash_total // cores)))
+    return result
+
+
+async def tune(
+    path: str,
+    depth: int,
+    configurations: list[tuple[int, int, int]],
+    games: list[tuple[str, list[str]]] | None = None,
+) -> list[TuningResult]:
+    """
+    Measures analysis of a fixed set of positions with each configuration
+
+    Engine start-up is not part of the measured time, as engine keeps
+    its processes running between analyses.
+
+    Args:
+        path (str): Path to Stockfish engine executable.
+        depth (int)
+        configurations (list[tuple[int, int, int]]): Number of processes, threads per process and hash per process in MB.
+        games (list[tuple[str, list[str]]] | None): Initial FEN and UCI moves of analyzed games. Defaults to a built-in game.
+
+    Returns:
+        list[TuningResult]: Results sorted from the fastest configuration.
+
+    Raises:
+        EngineError: If failed to run engine process; If failed to communicate with the engine process.
+    """
+    if games is None:
+        games = [(TUNING_FEN, TUNING_MOVES)]
+    positions = sum(len(moves) + 1 for _, moves in games)
+
+    results: list[TuningResult] = []
+    for max_workers, threads, hash_size in configurations:
+        engine = LocalStockfishEngine(
+            path,
+            depth,
+            1,
+            max_workers,
+            threads=threads,
+            hash_size=hash_size,
+        )
+        async with engine:
+            before = perf_counter()
+            await engine.analyze_many(games)
+            wall_time = perf_counter() - before
+        results.append(
+            TuningResult(max_workers, threads, hash_size, positions, wall_time)
+        )
+
+    return sorted(results, key=lambda result: result.wall_time)
+
+
+def save_config(path: str, result: TuningResult) -> None:
+    """Saves configuration as JSON file"""
+    with open(path, "w") as file:
+        dump(result.config(), file, indent=4)
+
+
+def load_config(path: str) -> dict[str, int]:
+    """
+    Loads configuration saved by `save_config`
+
+    Returns:
+        dict[str, int]: `LocalStockfishEngine` keyword arguments.
+    """
+    with open(path) as file:
+        return load(file)
+
+
+async def main():
+    from argparse import ArgumentParser
+
+    argument_parser = ArgumentParser(
+        description="Finds the fastest split of cores between Stockfish processes and threads"
+    )
+    argument_parser.add_argument("--engine", default="stockfish")
+    argument_parser.add_argument("--depth", type=int, default=16)
+    argument_parser.add_argument("--cores", type=int, default=cpu_count() or 1)
+    argument_parser.add_argument("--hash", type=int, default=1024, help="total MB")
+    argument_parser.add_argument("--save", help="path to save the best configuration")
+    args = argument_parser.parse_args()
+
+    results = await tune(args.engine, args.depth, combinations(args.cores, args.hash))
+    print(
+        f"{'processes':>9} {'threads':>7} {'hash':>6} {'positions/s':>11} {'wall time':>9}"
+    )
+    for result in results:
+        print(
+            f"{result.max_workers:>9} {result.threads:>7} {result.hash_size:>6} "
+            f"{result.positions_per_second:>11.2f} {result.wall_time:>8.2f}s"
+        )
+
+    best = results[0]
+    print(f"\nRecommended: {best.config()}")
+    if args.save:
+        save_config(args.save, best)
+        print(f"Saved to {args.save}")
+
+
+if __name__ == "__main__":
+    from asyncio import run
+
+    run(main())
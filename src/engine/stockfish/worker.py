@@ -1,23 +1,68 @@
 from subprocess import SubprocessError
-from asyncio import create_subprocess_exec, wait_for
+from asyncio import (
+    Future,
+    Task,
+    create_subprocess_exec,
+    create_task,
+    get_running_loop,
+    wait_for,
+)
 from asyncio.subprocess import PIPE, Process
 
+from ...models.info import InfoLine, parse_info_line
+from .search import Search
+
+
+# How long to wait for engine to acknowledge uci and isready commands in seconds
+RESPONSE_TIMEOUT = 10
 
-class StockfishEngineWorker:
-    """Stockfish Engine Worker"""
 
-    def __init__(self, path: str, depth: int, multipv: int):
+class StockfishEngineWorker:
+    """
+    Stockfish Engine Worker
+
+    Engine output is consumed by a reader task for the whole lifetime of the
+    subprocess. The reader parses analysis lines once, keeps the latest exact
+    line of each multipv and resolves pending responses as soon as `uciok`,
+    `readyok` or `bestmove` arrives, so results are correct however the search
+    stopped.
+
+    Args:
+        path (str): Path to Stockfish engine executable
+        depth (int | None): Depth of searches without explicit limits
+        multipv (int): Number of best engine lines to return
+        options (dict[str, str | int | bool] | None): UCI options set after the handshake, e.g. Threads or Hash
+    """
+
+    def __init__(
+        self,
+        path: str,
+        depth: int | None,
+        multipv: int,
+        options: dict[str, str | int | bool] | None = None,
+    ):
         if (
             not isinstance(path, str)
-            or not isinstance(depth, int)
+            or not isinstance(depth, int | None)
             or not isinstance(multipv, int)
+            or not isinstance(options, dict | None)
         ):
             raise TypeError("Invalid argument types")
 
         self.path = path
         self.depth = depth
         self.multipv = multipv
+        self.options = options if options is not None else {}
         self._process: Process | None = None
+        self._reader: Task | None = None
+        self._responses: dict[str, Future] = {}
+        # Latest line of each multipv
+        self._lines: dict[int, InfoLine] = {}
+        # Lines of the depth being searched, checked by search's cutoff
+        self._depth_lines: list[InfoLine] = []
+        self._stopped = False
+        self._search: Search | None = None
+        self._multipv = multipv
 
     async def open(self) -> None:
         """Opens Stockfish subprocess"""
@@ -26,19 +71,20 @@ class StockfishEngineWorker:
         )
         if self._process.stdin is None or self._process.stdout is None:
             raise SubprocessError("Subprocess was created, but stdin or stdout is None")
+        self._reader = create_task(self._read(self._process))
 
-        await self._write("uci\n")
-        while True:
-            line = await self._read_line()
-            if line == "uciok":
-                break
-            if line is None:
-                raise SubprocessError("Subprocess did not responded to uci command")
+        try:
+            await wait_for(self._request("uci\n", "uciok"), RESPONSE_TIMEOUT)
+        except TimeoutError:
+            raise SubprocessError("Subprocess did not responded to uci command")
 
         # Set engine options
+        for name, value in self.options.items():
+            if isinstance(value, bool):
+                value = "true" if value else "false"
+            await self._write(f"setoption name {name} value {value}\n")
         await self._write(f"setoption name MultiPV value {self.multipv}\n")
-        # await self._write(f"setoption name Threads value 1\n")
-        # await self._write(f"setoption name Hash value 64\n")
+        self._multipv = self.multipv
 
     async def close(self):
         """Closes Stockfish subprocess"""
@@ -48,60 +94,136 @@ class StockfishEngineWorker:
                 await wait_for(self._process.wait(), 1)
             except TimeoutError:
                 self._process.terminate()
+        self._stop_reader()
+
+    def kill(self) -> None:
+        """Kills Stockfish subprocess without waiting for it to quit"""
+        if self._process and self._process.returncode is None:
+            try:
+                self._process.kill()
+            except ProcessLookupError:
+                pass
+        self._process = None
+        self._stop_reader()
+
+    @property
+    def alive(self) -> bool:
+        """Whether Stockfish subprocess is running"""
+        return self._process is not None and self._process.returncode is None
 
     async def position(self, initial_fen: str, uci_moves: list[str]) -> None:
         """Sets board position"""
         if not isinstance(initial_fen, str) or not isinstance(uci_moves, list):
             raise TypeError("Invalid argument types")
 
-        await self._clear_stdout_stream()
-        await self._write("isready\n")
-        status = await self._read_line()
-        if status == "readyok":
-            await self._write(
-                f"position fen {initial_fen} moves {" ".join(uci_moves)}\n"
-            )
-        else:
+        try:
+            await wait_for(self._request("isready\n", "readyok"), RESPONSE_TIMEOUT)
+        except TimeoutError:
             raise SubprocessError("Subprocess did not responded to isready command")
+        await self._write(f"position fen {initial_fen} moves {" ".join(uci_moves)}\n")
+
+    async def go(self, search: Search | None = None) -> list[InfoLine]:
+        """
+        Analyzes position
+
+        Args:
+            search (Search | None): Limits of the search. Defaults to worker's depth and multipv.
+        """
+        if search is None:
+            search = Search(self.depth, self.multipv)
+        elif not isinstance(search, Search):
+            raise TypeError("Invalid argument types")
 
-    async def go(self) -> list[str]:
-        """Analyzes position"""
-        # TODO: Fix wrong result when analysing on higher depths
-        await self._write(f"go depth {self.depth}\n")
-        best_lines: list[str] = []
-        pv_counter = 0
-        while pv_counter < self.multipv:
-            line = await self._read_line()
-            if line is None:
-                continue
-            elif line.startswith(f"info depth {self.depth} seldepth"):
-                best_lines.append(line)
-                pv_counter += 1
-            elif line.startswith("bestmove"):
-                break
-        return best_lines
-
-    async def _read_line(self) -> str | None:
-        if self._process and self._process.stdout:
-            try:
-                line = await wait_for(self._process.stdout.readline(), 1)
-                return line.decode().strip()
-            except TimeoutError:
+        if search.multipv != self._multipv:
+            await self._write(f"setoption name MultiPV value {search.multipv}\n")
+            self._multipv = search.multipv
+
+        self._search = search
+        self._lines = {}
+        self._depth_lines = []
+        self._stopped = False
+        await self._request(search.command(), "bestmove")
+        return [self._lines[multipv] for multipv in sorted(self._lines)]
+
+    async def _request(self, command: str, response: str) -> None:
+        if self._reader is None or self._reader.done():
+            raise SubprocessError("Subprocess output stream is closed")
+
+        future = get_running_loop().create_future()
+        self._responses[response] = future
+        try:
+            await self._write(command)
+            await future
+        finally:
+            self._responses.pop(response, None)
+
+    async def _read(self, process: Process) -> None:
+        assert process.stdout is not None
+        try:
+            while line := await process.stdout.readline():
+                self._handle_line(line.decode().strip())
+        finally:
+            for future in self._responses.values():
+                if not future.done():
+                    future.set_exception(
+                        SubprocessError("Subprocess closed its output stream")
+                    )
+
+    def _handle_line(self, line: str) -> None:
+        if line.startswith("info depth "):
+            if self._stopped or self._search is None:
+                return None
+            info = parse_info_line(line)
+            # Lines with bound scores come from failed aspiration windows,
+            # their scores are not exact
+            if info is None or info.bound is not None:
+                return None
+            if info.multipv <= self._search.multipv:
+                self._lines[info.multipv] = info
+            if self._search.cutoff is not None:
+                self._check_cutoff(info)
+            return None
+
+        response = line.split(" ", 1)[0]
+        future = self._responses.get(response)
+        if future is not None and not future.done():
+            future.set_result(None)
+
+    def _check_cutoff(self, line: InfoLine) -> None:
+        assert self._search is not None and self._search.cutoff is not None
+        if line.depth < self._search.cutoff.depth:
+            return None
+
+        if self._depth_lines and self._depth_lines[0].depth != line.depth:
+            # Previous depth is complete, even with fewer legal moves than multipv
+            if self._cut(self._depth_lines):
                 return None
+            self._depth_lines = []
+        self._depth_lines.append(line)
+        if len(self._depth_lines) == self._search.multipv:
+            if self._cut(self._depth_lines):
+                return None
+            self._depth_lines = []
+
+    def _cut(self, lines: list[InfoLine]) -> bool:
+        assert self._search is not None and self._search.cutoff is not None
+        if not self._search.cutoff.decided(lines[0]):
+            return False
+        self._lines = dict(enumerate(lines, 1))
+        self._stopped = True
+        if self._process and self._process.stdin:
+            self._process.stdin.write(b"stop\n")
+        return True
 
     async def _write(self, command: str) -> None:
         if self._process and self._process.stdin:
             self._process.stdin.write(command.encode())
             await self._process.stdin.drain()
 
-    async def _clear_stdout_stream(self) -> None:
-        if self._process and self._process.stdout:
-            try:
-                await wait_for(self._process.stdout.read(), 0.1)
-            except TimeoutError:
-                pass
-            finally:
-                return None
+    def _stop_reader(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
 
 
 async def main():
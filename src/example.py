@@ -3,8 +3,9 @@ from typing import Any
 from .fetcher import ChessComFetcher
 from .parser import ChessComGameParser, StockfishAnalysisParser
 from .chess import ChessPy
-from .engine.stockfish import LocalStockfishEngine
+from .engine.stockfish import LocalStockfishEngine, Cutoff, Triage
 from .puzzle import AnalysisBasedPuzzleCreator
+from .pipeline import Pipeline
 from .models import Game, Move, Analysis, Puzzle
 
 
@@ -26,38 +27,30 @@ async def example():
         game_parser.parse(game, USERNAME) for game in fetched_games[:LIMIT]
     ]
 
-    # === Analyze games === #
-    engine = LocalStockfishEngine("stockfish", DEPTH, MULTIPV, MAX_WORKERS)
-    analysis_parser = StockfishAnalysisParser()
-    for game in games:
-        analyses: list[list[Analysis]] = []
-        uci_moves: list[str] = [move.uci_move.value for move in game.moves]
-
-        # Outer list represents each move, inner list holds n best lines
-        unparsed_analyses: list[list[str]] = await engine.analyze(
-            game.initial_fen, uci_moves
-        )
-
-        analyses: list[list[Analysis]] = []
-        for i, unparsed_best_lines in enumerate(unparsed_analyses):
-            best_lines: list[Analysis] = []
-            for line in unparsed_best_lines:
-                best_lines.append(
-                    analysis_parser.parse(line, game.initial_fen, game.moves[:i])
-                )
-            analyses.append(best_lines)
-        game.analyses = analyses
-
-    # === Create puzzles === #
+    # === Analyze games and create puzzles === #
     puzzle_creator = AnalysisBasedPuzzleCreator()
+    # Positions far outside of puzzle creator's window are not searched fully
+    cutoff = Cutoff(window=2 * puzzle_creator.window)
+    # Only candidate puzzle positions are searched with all MULTIPV lines
+    triage = Triage(depth=None)
+    engine = LocalStockfishEngine(
+        "stockfish", DEPTH, MULTIPV, MAX_WORKERS, triage=triage, cutoff=cutoff
+    )
+    pipeline = Pipeline(
+        fetcher,
+        game_parser,
+        engine,
+        StockfishAnalysisParser(),
+        puzzle_creator,
+    )
     puzzles: list[Puzzle] = []
-    for game in games:
-        puzzles.extend(puzzle_creator.create(game))
-
-    print(f"Found {len(puzzles)} puzzles", end="\n\n")
+    async with engine:
+        # Puzzles of a game are yielded as soon as all its positions are analyzed
+        async for puzzle in pipeline.create(games):
+            puzzles.append(puzzle)
+            print(puzzle, end="\n\n")
 
-    for puzzle in puzzles:
-        print(puzzle, end="\n\n")
+    print(f"Found {len(puzzles)} puzzles")
 
 
 if __name__ == "__main__":
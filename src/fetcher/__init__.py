@@ -1,2 +1,3 @@
 from .fetcher import Fetcher, ChessComFetcher, LichessFetcher
+from .cache import ArchiveCache
 from .error import FetcherError
@@ -0,0 +1,67 @@
+from json import JSONDecoder
+from re import compile
+from typing import Any, Iterator
+
+from .error import FetcherError
+
+
+# Fields of Chess.com games kept by default, needed by the game parser,
+# the fetcher's own filters and for identifying the game
+CHESSCOM_FIELDS = (
+    "uuid",
+    "url",
+    "pgn",
+    "initial_setup",
+    "white",
+    "black",
+    "end_time",
+    "rules",
+    "time_class",
+    "time_control",
+    "rated",
+)
+
+_decoder = JSONDecoder()
+_start = compile(r'\s*\{\s*"games"\s*:\s*\[')
+_whitespace = compile(r"\s*")
+
+
+def archive_games(body: str) -> Iterator[dict[str, Any]]:
+    """
+    Decodes games of Chess.com monthly archive one by one
+
+    Only a single game is held as Python objects at a time, unlike
+    decoding the whole archive at once. Body is checked to be an archive
+    immediately, games are decoded as they are iterated.
+
+    Args:
+        body (str): Archive response, `{"games": [...]}`
+
+    Returns:
+        Iterator[dict[str, Any]]: Games in archive order.
+
+    Raises:
+        FetcherError: If body is not an archive. If any game is not valid JSON.
+    """
+    match = _start.match(body)
+    if match is None:
+        raise FetcherError("Invalid archive")
+    return _decode(body, match.end())
+
+
+def _decode(body: str, index: int) -> Iterator[dict[str, Any]]:
+    index = _whitespace.match(body, index).end()  # type: ignore[union-attr]
+    if body.startswith("]", index):
+        return
+    while True:
+        try:
+            game, index = _decoder.raw_decode(body, index)
+        except ValueError as e:
+            raise FetcherError(e)
+        yield game
+        index = _whitespace.match(body, index).end()  # type: ignore[union-attr]
+        if body.startswith("]", index):
+            return
+        if not body.startswith(",", index):
+            raise FetcherError("Invalid archive")
+        index = _whitespace.match(body, index + 1).end()  # type: ignore[union-attr]
@@ -0,0 +1,177 @@
+from sqlite3 import connect, Error as SQLiteError
+from typing import NamedTuple
+
+from .error import FetcherError
+
+
+class Archive(NamedTuple):
+    """Cached response of an archive"""
+
+    body: str
+    etag: str | None
+    last_modified: str | None
+    final: bool
+
+
+class ArchiveCache:
+    """
+    Persistent Archive Cache
+
+    Stores responses of monthly archives in a SQLite database, keyed by URL.
+    Archives of past months never change and are marked final, so they are
+    never requested again. Archive of the current month is stored with its
+    ETag and Last-Modified headers, which are used to revalidate it.
+    Cache also holds sync cursor of every user, timestamp of the last game
+    that was synced.
+
+    Args:
+        path (str): Path to database file, ":memory:" keeps cache in memory
+
+    Raises:
+        TypeError
+        ValueError
+        FetcherError: If failed to open database.
+    """
+
+    def __init__(self, path: str):
+        if not isinstance(path, str):
+            raise TypeError("Invalid argument types")
+
+        if not path:
+            raise ValueError("Invalid argument values")
+
+        self.path = path
+
+        try:
+            self._connection = connect(path)
+            self._connection.executescript(
+                """
+                PRAGMA journal_mode = WAL;
+                PRAGMA synchronous = NORMAL;
+                CREATE TABLE IF NOT EXISTS archives (
+                    url TEXT PRIMARY KEY,
+                    body TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    final INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS cursors (
+                    username TEXT PRIMARY KEY,
+                    timestamp INTEGER NOT NULL
+                );
+                """
+            )
+        except SQLiteError as e:
+            raise FetcherError(e)
+
+    def get(self, url: str) -> Archive | None:
+        """
+        Returns cached archive
+
+        Args:
+            url (str)
+
+        Returns:
+            Archive | None: None if archive is not cached.
+
+        Raises:
+            FetcherError: If failed to query database.
+        """
+        try:
+            row = self._connection.execute(
+                "SELECT body, etag, last_modified, final FROM archives WHERE url = ?",
+                (url,),
+            ).fetchone()
+        except SQLiteError as e:
+            raise FetcherError(e)
+        if row is None:
+            return None
+        return Archive(row[0], row[1], row[2], bool(row[3]))
+
+    def put(self, url: str, archive: Archive) -> None:
+        """
+        Stores archive
+
+        Args:
+            url (str)
+            archive (Archive)
+
+        Raises:
+            FetcherError: If failed to write into database.
+        """
+        try:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO archives (url, body, etag, last_modified, final) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, *archive),
+            )
+            self._connection.commit()
+        except SQLiteError as e:
+            raise FetcherError(e)
+
+    def cursor(self, username: str) -> int | None:
+        """
+        Returns sync cursor of the user
+
+        Args:
+            username (str)
+
+        Returns:
+            int | None: Timestamp of the last synced game. None if user was never synced.
+
+        Raises:
+            FetcherError: If failed to query database.
+        """
+        try:
+            row = self._connection.execute(
+                "SELECT timestamp FROM cursors WHERE username = ?",
+                (username.lower(),),
+            ).fetchone()
+        except SQLiteError as e:
+            raise FetcherError(e)
+        return None if row is None else row[0]
+
+    def set_cursor(self, username: str, timestamp: int) -> None:
+        """
+        Stores sync cursor of the user
+
+        Args:
+            username (str)
+            timestamp (int): Timestamp of the last synced game.
+
+        Raises:
+            FetcherError: If failed to write into database.
+        """
+        try:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO cursors (username, timestamp) VALUES (?, ?)",
+                (username.lower(), timestamp),
+            )
+            self._connection.commit()
+        except SQLiteError as e:
+            raise FetcherError(e)
+
+    def clear(self) -> None:
+        """
+        Removes all archives and cursors
+
+        Raises:
+            FetcherError: If failed to write into database.
+        """
+        try:
+            self._connection.executescript("DELETE FROM archives; DELETE FROM cursors;")
+        except SQLiteError as e:
+            raise FetcherError(e)
+
+    def close(self) -> None:
+        """Closes database"""
+        self._connection.close()
+
+    def __enter__(self) -> "ArchiveCache":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"ArchiveCache({self.path})"
@@ -1,11 +1,18 @@
-from datetime import date
+from asyncio import Semaphore, Task, create_task, gather, sleep
+from collections import deque
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timezone
+from itertools import islice
 from time import time
-from typing import Any, Iterable, Protocol
+from typing import Any, AsyncIterator, Iterable, Protocol
 from json import loads
 
-from httpx import AsyncClient, HTTPError
+from httpx import AsyncClient, HTTPError, Limits, TransportError
 
+from .archive import CHESSCOM_FIELDS, archive_games
+from .cache import Archive, ArchiveCache
 from .error import FetcherError
+from .limiter import TokenBucket, retry_after
 
 
 class Fetcher(Protocol):
@@ -41,14 +48,170 @@ class Fetcher(Protocol):
         """
         raise NotImplementedError
 
+    def fetch_stream(
+        self,
+        username: str,
+        since: int,
+        until: int | None = None,
+    ) -> AsyncIterator[Any]:
+        """
+        Fetches chess games, yielding them as soon as they are downloaded
+
+        Games are downloaded only as fast as they are consumed.
+
+        Args:
+            username (str)
+            since (int): Since when to fetch the games as unix timestamp.
+            until (int | None): Until when to fetch the games as unix timestamp. Defaults to now.
+
+        Yields:
+            Any: Fetched game.
+
+        Raises:
+            TypeError
+            ValueError
+            FetcherError: If arguments are logically invalid. If failed to fetch games.
+        """
+        raise NotImplementedError
+
+    async def fetch_many(
+        self,
+        usernames: list[str],
+        since: int,
+        until: int | None = None,
+    ) -> dict[str, list[Any]]:
+        """
+        Fetches chess games of multiple users concurrently
+
+        Args:
+            usernames (list[str])
+            since (int): Since when to fetch the games as unix timestamp.
+            until (int | None): Until when to fetch the games as unix timestamp. Defaults to now.
+
+        Returns:
+            dict[str, list[Any]]: Games of every user.
+
+        Raises:
+            TypeError
+            ValueError
+            FetcherError: If arguments are logically invalid. If failed to fetch games of any user.
+        """
+        raise NotImplementedError
+
 
 class ChessComFetcher:
+    """
+    Chess.com Fetcher
+
+    Monthly archives are downloaded concurrently, at most `max_concurrency`
+    at once and at most `rate` requests per second. Requests answered with
+    429 or 5xx are retried after the time given by Retry-After header or with
+    exponential backoff. Games are yielded in month order.
+
+    Archives are kept as text until their games are yielded and games are
+    decoded one by one, keeping only `fields`, so memory holds a single
+    decoded game instead of whole months of them.
+
+    With cache, archives of past months are downloaded only once and archive
+    of the current month is revalidated with a conditional request. Cache
+    also enables `sync`, which fetches only games finished since the last sync.
+
+    Limits are shared by all calls, so `fetch_many` fetches users
+    concurrently without exceeding them. Fetcher used as async context
+    manager keeps a single pooled HTTP client, otherwise every call opens
+    its own client, unless `client` is given.
+
+    Args:
+        base_url (str): Chess.com API server, e.g. a local stand-in for testing
+        max_concurrency (int): Maximal number of archives downloaded at once, by all calls
+        rate (float): Maximal number of requests per second
+        max_retries (int): Retries of a single archive before giving up
+        backoff (float): Seconds to wait before the first retry, doubled with every retry
+        cache (ArchiveCache | None)
+        client (AsyncClient | None): Shared HTTP client, which is not closed by fetcher
+        fields (tuple[str, ...] | None): Fields of yielded games, None keeps all fields
+
+    Raises:
+        TypeError
+        ValueError
+    """
+
+    def __init__(
+        self,
+        base_url: str = "https://api.chess.com",
+        max_concurrency: int = 4,
+        rate: float = 4.0,
+        max_retries: int = 5,
+        backoff: float = 1.0,
+        cache: ArchiveCache | None = None,
+        client: AsyncClient | None = None,
+        fields: tuple[str, ...] | None = CHESSCOM_FIELDS,
+    ):
+        if (
+            not isinstance(base_url, str)
+            or not isinstance(max_concurrency, int)
+            or not isinstance(rate, int | float)
+            or not isinstance(max_retries, int)
+            or not isinstance(backoff, int | float)
+            or not isinstance(cache, ArchiveCache | None)
+            or not isinstance(client, AsyncClient | None)
+            or not isinstance(fields, tuple | None)
+        ):
+            raise TypeError("Invalid argument types")
+
+        if max_concurrency < 1 or rate <= 0 or max_retries < 0 or backoff < 0:
+            raise ValueError("Invalid argument values")
+
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.rate = rate
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.cache = cache
+        self.client = client
+        self.fields = fields
+        self._owns_client = False
+        self._limiter = TokenBucket(rate, max_concurrency)
+        self._requests = Semaphore(max_concurrency)
+
     async def fetch(
         self,
         username: str,
         since: int,
         until: int | None = None,
     ) -> list[dict[str, Any]]:
+        return [game async for game in self.fetch_stream(username, since, until)]
+
+    async def fetch_many(
+        self,
+        usernames: list[str],
+        since: int,
+        until: int | None = None,
+    ) -> dict[str, list[dict[str, Any]]]:
+        return await _fetch_many(self, usernames, since, until)
+
+    async def close(self) -> None:
+        """Closes HTTP client owned by fetcher"""
+        if self._owns_client and self.client is not None:
+            await self.client.aclose()
+            self.client = None
+            self._owns_client = False
+
+    async def __aenter__(self) -> "ChessComFetcher":
+        if self.client is None:
+            self.client = _client(self.max_concurrency)
+            self._owns_client = True
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        await self.close()
+
+    async def fetch_stream(
+        self,
+        username: str,
+        since: int,
+        until: int | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
         # Fetching from Chess.com public API
         # https://www.chess.com/news/view/published-data-api
         # Endpoint:
@@ -78,8 +241,11 @@ class ChessComFetcher:
 
         since_date = date.fromtimestamp(since)
         until_date = date.fromtimestamp(until)
+        # Archives of months before this one are complete, a day of margin
+        # covers time zone of the server
+        open_month = datetime.fromtimestamp(current_timestamp - 86400, timezone.utc)
 
-        urls: list[str] = []
+        urls: list[tuple[str, bool]] = []
         for year in range(since_date.year, until_date.year + 1):
             for month in range(1, 13):
                 if year == since_date.year and month < since_date.month:
@@ -87,39 +253,229 @@ class ChessComFetcher:
                 if year == until_date.year and month > until_date.month:
                     break
                 urls.append(
-                    f"https://api.chess.com/pub/player/{username}/games/{year}/{month:02}"
+                    (
+                        f"{self.base_url}/pub/player/{username}/games/{year}/{month:02}",
+                        (year, month) < (open_month.year, open_month.month),
+                    )
                 )
 
-        games: list[dict[str, Any]] = []
-        async with AsyncClient() as client:
-            # Send requests synchronously to not encounter any rate limiting
-            for url in urls:
-                try:
-                    response = await client.get(url)
-                    games.extend(response.json()["games"])
-                except (HTTPError, KeyError) as e:
+        fields = self.fields
+        remaining = iter(urls)
+        pending: deque[Task[str]] = deque()
+        async with _session(self.client, self.max_concurrency) as client:
+            try:
+                # Archives are downloaded ahead of the one being yielded,
+                # but always awaited in month order
+                for url, final in islice(remaining, self.max_concurrency):
+                    pending.append(create_task(self._archive(client, url, final)))
+                while pending:
+                    body = await pending.popleft()
+                    url, final = next(remaining, (None, False))
+                    if url is not None:
+                        pending.append(create_task(self._archive(client, url, final)))
+                    try:
+                        for game in archive_games(body):
+                            if (
+                                since <= game["end_time"] <= until
+                                and game["rules"] == "chess"
+                            ):
+                                if fields is not None:
+                                    game = {
+                                        field: game[field]
+                                        for field in fields
+                                        if field in game
+                                    }
+                                yield game
+                    except KeyError as e:
+                        raise FetcherError(e)
+                    # Archive is not held while the next one is awaited
+                    del body
+            finally:
+                for task in pending:
+                    task.cancel()
+                await gather(*pending, return_exceptions=True)
+
+    async def sync(self, username: str, since: int) -> AsyncIterator[dict[str, Any]]:
+        """
+        Fetches games finished since the last sync of the user
+
+        Sync cursor is advanced to the last game once all games were consumed,
+        so interrupted sync is repeated the next time.
+
+        Args:
+            username (str)
+            since (int): Since when to fetch the games as unix timestamp, if user was never synced.
+
+        Yields:
+            dict[str, Any]: Fetched game.
+
+        Raises:
+            TypeError
+            ValueError
+            FetcherError: If fetcher has no cache. If failed to fetch games.
+        """
+        if not isinstance(username, str) or not isinstance(since, int):
+            raise TypeError("Invalid argument types")
+
+        if self.cache is None:
+            raise FetcherError("Sync requires cache")
+
+        cursor = self.cache.cursor(username)
+        if cursor is not None:
+            since = max(since, cursor + 1)
+            if since > time():
+                return
+
+        last: int | None = None
+        async for game in self.fetch_stream(username, since):
+            if last is None or game["end_time"] > last:
+                last = game["end_time"]
+            yield game
+        if last is not None:
+            self.cache.set_cursor(username, last)
+
+    async def _archive(self, client: AsyncClient, url: str, final: bool) -> str:
+        """Downloads a monthly archive, retrying if server is busy"""
+        cached = None if self.cache is None else self.cache.get(url)
+        if cached is not None and cached.final:
+            return cached.body
+
+        headers: dict[str, str] = {}
+        if cached is not None:
+            if cached.etag is not None:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified is not None:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._requests:
+                    await self._limiter.acquire()
+                    response = await client.get(url, headers=headers)
+            except TransportError as e:
+                if attempt == self.max_retries:
                     raise FetcherError(e)
-        try:
-            return [
-                game
-                for game in games
-                if since <= game["end_time"] <= until and game["rules"] == "chess"
-            ]
-        except KeyError as e:
-            raise FetcherError(e)
+                await sleep(self.backoff * 2**attempt)
+                continue
+            except HTTPError as e:
+                raise FetcherError(e)
+
+            if response.status_code == 429 or response.status_code >= 500:
+                if attempt == self.max_retries:
+                    raise FetcherError(f"{url}: HTTP {response.status_code}")
+                delay = retry_after(response.headers.get("Retry-After"))
+                await sleep(self.backoff * 2**attempt if delay is None else delay)
+                continue
+
+            if self.cache is not None and cached is not None:
+                if response.status_code == 304:
+                    if final:
+                        self.cache.put(url, cached._replace(final=True))
+                    return cached.body
+
+            body = response.text
+            # Checks body is an archive before it is cached
+            archive_games(body)
+            if self.cache is not None and response.status_code == 200:
+                self.cache.put(
+                    url,
+                    Archive(
+                        body,
+                        response.headers.get("ETag"),
+                        response.headers.get("Last-Modified"),
+                        final,
+                    ),
+                )
+            return body
+        raise FetcherError(url)
 
 
 class LichessFetcher:
+    """
+    Lichess Fetcher
+
+    Games of a user are streamed by a single request. Lichess asks clients
+    to make one request at a time, so `fetch_many` fetches users one by one
+    unless `max_concurrency` is raised. Fetcher used as async context
+    manager keeps a single pooled HTTP client, otherwise every call opens
+    its own client, unless `client` is given.
+
+    Args:
+        base_url (str): Lichess server, e.g. a local stand-in for testing
+        max_concurrency (int): Maximal number of users streamed at once, by all calls
+        client (AsyncClient | None): Shared HTTP client, which is not closed by fetcher
+
+    Raises:
+        TypeError
+        ValueError
+    """
+
+    def __init__(
+        self,
+        base_url: str = "https://lichess.org",
+        max_concurrency: int = 1,
+        client: AsyncClient | None = None,
+    ):
+        if (
+            not isinstance(base_url, str)
+            or not isinstance(max_concurrency, int)
+            or not isinstance(client, AsyncClient | None)
+        ):
+            raise TypeError("Invalid argument types")
+
+        if max_concurrency < 1:
+            raise ValueError("Invalid argument values")
+
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.client = client
+        self._owns_client = False
+        self._requests = Semaphore(max_concurrency)
+
     async def fetch(
         self,
         username: str,
         since: int,
         until: int | None = None,
     ) -> list[dict[str, Any]]:
+        return [game async for game in self.fetch_stream(username, since, until)]
+
+    async def fetch_many(
+        self,
+        usernames: list[str],
+        since: int,
+        until: int | None = None,
+    ) -> dict[str, list[dict[str, Any]]]:
+        return await _fetch_many(self, usernames, since, until)
+
+    async def close(self) -> None:
+        """Closes HTTP client owned by fetcher"""
+        if self._owns_client and self.client is not None:
+            await self.client.aclose()
+            self.client = None
+            self._owns_client = False
+
+    async def __aenter__(self) -> "LichessFetcher":
+        if self.client is None:
+            self.client = _client(self.max_concurrency)
+            self._owns_client = True
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        await self.close()
+
+    async def fetch_stream(
+        self,
+        username: str,
+        since: int,
+        until: int | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
         # Fetching from Lichess.org public API
         # https://lichess.org/api#tag/Games/operation/apiGamesUser
         # Endpoint:
         # https://lichess.org/api/games/user/{username} + query parameters
+        # Games are sent as NDJSON, one line per game, and are read from the
+        # response as they arrive
 
         current_timestamp = int(time())
         if until is None:
@@ -143,7 +499,7 @@ class LichessFetcher:
         ):
             raise ValueError("Invalid argument values")
 
-        url = f"https://lichess.org/api/games/user/{username}"
+        url = f"{self.base_url}/api/games/user/{username}"
         headers = {
             "Accept": "application/x-ndjson",
         }
@@ -151,18 +507,65 @@ class LichessFetcher:
             "since": since * 1000,
             "until": until * 1000,
             "perfType": "ultraBullet,bullet,blitz,rapid,classical,correspondence,chess960",
+            # Server analysis of analyzed games, saves engine work
+            "evals": "true",
         }
 
-        games = []
-        async with AsyncClient() as client:
+        async with self._requests, _session(self.client, 1) as client:
             try:
-                response = await client.get(url, headers=headers, params=params)
-                for game in response.iter_lines():
-                    games.append(loads(game))
-            except HTTPError as e:
+                async with client.stream(
+                    "GET", url, headers=headers, params=params
+                ) as response:
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if line:
+                            yield loads(line)
+            except (HTTPError, ValueError) as e:
                 raise FetcherError(e)
 
-        return games
+
+def _client(max_connections: int) -> AsyncClient:
+    return AsyncClient(
+        limits=Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        )
+    )
+
+
+@asynccontextmanager
+async def _session(
+    client: AsyncClient | None, max_connections: int
+) -> AsyncIterator[AsyncClient]:
+    """Yields shared client, or a client closed afterwards"""
+    if client is not None:
+        yield client
+        return
+    async with _client(max_connections) as client:
+        yield client
+
+
+async def _fetch_many(
+    fetcher: "ChessComFetcher | LichessFetcher",
+    usernames: list[str],
+    since: int,
+    until: int | None,
+) -> dict[str, list[dict[str, Any]]]:
+    if not isinstance(usernames, list):
+        raise TypeError("Invalid argument types")
+
+    # Fetcher's limits are shared, so all users are scheduled at once
+    tasks = [
+        create_task(fetcher.fetch(username, since, until)) for username in usernames
+    ]
+    try:
+        results = await gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await gather(*tasks, return_exceptions=True)
+        raise
+    return dict(zip(usernames, results))
 
 
 async def main():
@@ -0,0 +1,73 @@
+from asyncio import sleep
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from time import monotonic
+
+
+class TokenBucket:
+    """
+    Token Bucket Rate Limiter
+
+    Every request takes a token, tokens are refilled at a constant rate up to
+    the capacity, which allows short bursts.
+
+    Args:
+        rate (float): Tokens refilled per second
+        capacity (int): Maximal number of tokens
+
+    Raises:
+        TypeError
+        ValueError
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        if not isinstance(rate, int | float) or not isinstance(capacity, int):
+            raise TypeError("Invalid argument types")
+
+        if rate <= 0 or capacity < 1:
+            raise ValueError("Invalid argument values")
+
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = monotonic()
+
+    async def acquire(self) -> None:
+        """Waits for a token and takes it"""
+        while True:
+            now = monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return None
+            await sleep((1 - self._tokens) / self.rate)
+
+    def __repr__(self) -> str:
+        return f"TokenBucket({self.rate}, {self.capacity})"
+
+
+def retry_after(value: str | None) -> float | None:
+    """
+    Parses Retry-After header
+
+    Args:
+        value (str | None): Number of seconds or HTTP date.
+
+    Returns:
+        float | None: Seconds to wait. None if header is missing or invalid.
+    """
+    if value is None:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_date.tzinfo is None:
+        retry_date = retry_date.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_date - datetime.now(timezone.utc)).total_seconds())
@@ -6,3 +6,4 @@ from .puzzle import Puzzle
 from .color import Color
 from .platform import Platform
 from .score import Score, ScoreName
+from .info import InfoLine
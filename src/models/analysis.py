@@ -11,6 +11,8 @@ class Analysis:
         ValueError
     """
 
+    __slots__ = ("move", "multipv", "score")
+
     def __init__(self, move: Move, multipv: int, score: Score):
         if (
             not isinstance(move, Move)
@@ -23,5 +25,14 @@ class Analysis:
         self.multipv = multipv
         self.score = score
 
+    @classmethod
+    def trusted(cls, move: Move, multipv: int, score: Score) -> "Analysis":
+        """Creates analysis without validation, arguments must be valid"""
+        self = object.__new__(cls)
+        self.move = move
+        self.multipv = multipv
+        self.score = score
+        return self
+
     def __repr__(self) -> str:
         return f"Analysis({self.move}, {self.multipv}, {self.score})"
@@ -14,6 +14,18 @@ class Game:
         ValueError
     """
 
+    __slots__ = (
+        "game_id",
+        "platform",
+        "url",
+        "white",
+        "black",
+        "side",
+        "initial_fen",
+        "moves",
+        "analyses",
+    )
+
     def __init__(
         self,
         game_id: str,
@@ -24,7 +36,7 @@ class Game:
         side: Color,
         initial_fen: str,
         moves: list[Move],
-        analyses: list[list[Analysis]] | None = None,
+        analyses: list[list[Analysis] | None] | None = None,
     ):
         if (
             not isinstance(game_id, str)
@@ -0,0 +1,122 @@
+from typing import Any, NamedTuple
+
+
+class InfoLine(NamedTuple):
+    """
+    Represents engine analysis line
+
+    Parsed once from UCI `info` output, e.g.:
+    info depth 25 seldepth 31 multipv 1 score cp 33 nodes 4464545 nps 1267256
+    hashfull 937 tbhits 0 time 3523 pv e2e4 e7e5 g1f3
+    """
+
+    depth: int
+    seldepth: int
+    multipv: int
+    # "cp" or "mate", relative to side to move
+    score_name: str
+    score_value: int
+    # "upperbound" or "lowerbound" if score is not exact
+    bound: str | None
+    nodes: int
+    nps: int
+    # Search time in milliseconds
+    time: int
+    pv: tuple[str, ...]
+
+
+# Keys of info output followed by a single integer
+INTEGER_KEYS = ("depth", "seldepth", "multipv", "nodes", "nps", "time")
+
+
+def parse_info_line(line: str) -> InfoLine | None:
+    """
+    Parses UCI info output
+
+    Returns:
+        InfoLine | None: None if output does not contain score and principal variation.
+    """
+    parts = line.split(" ")
+    values = {"depth": 0, "seldepth": 0, "multipv": 1, "nodes": 0, "nps": 0, "time": 0}
+    score_name, score_value, bound = None, None, None
+    pv: tuple[str, ...] = ()
+    i = 1
+    try:
+        while i < len(parts):
+            part = parts[i]
+            if part in INTEGER_KEYS:
+                values[part] = int(parts[i + 1])
+                i += 2
+            elif part == "score":
+                score_name = parts[i + 1]
+                score_value = int(parts[i + 2])
+                i += 3
+                if i < len(parts) and parts[i] in ("upperbound", "lowerbound"):
+                    bound = parts[i]
+                    i += 1
+            elif part == "pv":
+                pv = tuple(parts[i + 1 :])
+                break
+            elif part == "string":
+                break
+            else:
+                i += 1
+    except (IndexError, ValueError):
+        return None
+
+    if score_name is None or score_value is None or not pv:
+        return None
+
+    return InfoLine(
+        values["depth"],
+        values["seldepth"],
+        values["multipv"],
+        score_name,
+        score_value,
+        bound,
+        values["nodes"],
+        values["nps"],
+        values["time"],
+        pv,
+    )
+
+
+def load_info_line(value: Any) -> InfoLine | None:
+    """
+    Restores analysis line from its JSON form
+
+    Args:
+        value (Any): JSON array of `InfoLine` fields.
+
+    Returns:
+        InfoLine | None: None if value is not a valid analysis line.
+    """
+    if not isinstance(value, list) or len(value) != len(InfoLine._fields):
+        return None
+    depth, seldepth, multipv, score_name, score_value, bound, nodes, nps, time, pv = (
+        value
+    )
+    if (
+        not all(
+            isinstance(field, int) and not isinstance(field, bool)
+            for field in (depth, seldepth, multipv, score_value, nodes, nps, time)
+        )
+        or score_name not in ("cp", "mate")
+        or bound not in (None, "upperbound", "lowerbound")
+        or not isinstance(pv, list)
+        or not pv
+        or not all(isinstance(move, str) for move in pv)
+    ):
+        return None
+    return InfoLine(
+        depth,
+        seldepth,
+        multipv,
+        score_name,
+        score_value,
+        bound,
+        nodes,
+        nps,
+        time,
+        tuple(pv),
+    )
@@ -10,6 +10,8 @@ class SanMove:
         ValueError
     """
 
+    __slots__ = ("value",)
+
     def __init__(self, value: str):
         if not isinstance(value, str):
             raise TypeError("Invalid argument types", type(value))
@@ -18,6 +20,13 @@ class SanMove:
 
         self.value = value
 
+    @classmethod
+    def trusted(cls, value: str) -> "SanMove":
+        """Creates move without validation, arguments must be valid"""
+        self = object.__new__(cls)
+        self.value = value
+        return self
+
     def __repr__(self) -> str:
         return f"SanMove({self.value})"
 
@@ -31,6 +40,8 @@ class UciMove:
         ValueError
     """
 
+    __slots__ = ("value",)
+
     def __init__(self, value: str):
         if not isinstance(value, str):
             raise TypeError("Invalid argument types", type(value))
@@ -39,6 +50,13 @@ class UciMove:
 
         self.value = value
 
+    @classmethod
+    def trusted(cls, value: str) -> "UciMove":
+        """Creates move without validation, arguments must be valid"""
+        self = object.__new__(cls)
+        self.value = value
+        return self
+
     def __repr__(self) -> str:
         return f"UciMove({self.value})"
 
@@ -51,6 +69,8 @@ class Move:
         TypeError
     """
 
+    __slots__ = ("san_move", "uci_move", "side")
+
     def __init__(
         self,
         san_move: SanMove,
@@ -68,5 +88,14 @@ class Move:
         self.uci_move = uci_move
         self.side = side
 
+    @classmethod
+    def trusted(cls, san_move: SanMove, uci_move: UciMove, side: Color) -> "Move":
+        """Creates move without validation, arguments must be valid"""
+        self = object.__new__(cls)
+        self.san_move = san_move
+        self.uci_move = uci_move
+        self.side = side
+        return self
+
     def __repr__(self) -> str:
         return f"Move(\n{self.san_move}\n{self.uci_move}\n{self.side}\n)"
@@ -7,6 +7,8 @@ class Player:
         ValueError
     """
 
+    __slots__ = ("username", "rating")
+
     def __init__(self, username: str, rating: int):
         if not isinstance(username, str) or not isinstance(rating, int):
             raise TypeError("Invalid argument types")
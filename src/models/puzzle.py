@@ -15,6 +15,19 @@ class Puzzle:
         ValueError
     """
 
+    __slots__ = (
+        "fen",
+        "move",
+        "score",
+        "best_lines",
+        "game_id",
+        "platform",
+        "url",
+        "white",
+        "black",
+        "side",
+    )
+
     def __init__(
         self,
         fen: str,
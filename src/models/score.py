@@ -9,16 +9,27 @@ class ScoreName(Enum):
 class Score:
     """
     Represents analysis score
-    
+
     Raises:
         TypeError
     """
+
+    __slots__ = ("score_name", "score_value")
+
     def __init__(self, score_name: ScoreName, score_value: int):
         if not isinstance(score_name, ScoreName) or not isinstance(score_value, int):
             raise TypeError("Invalid argument types")
-        
+
+        self.score_name = score_name
+        self.score_value = score_value
+
+    @classmethod
+    def trusted(cls, score_name: ScoreName, score_value: int) -> "Score":
+        """Creates score without validation, arguments must be valid"""
+        self = object.__new__(cls)
         self.score_name = score_name
         self.score_value = score_value
+        return self
 
     def __repr__(self) -> str:
         return f"Score({self.score_name}, {self.score_value})"
@@ -1,3 +1,5 @@
 from .game import GameParser, ChessComGameParser , LichessGameParser
 from .analysis import AnalysisParser, StockfishAnalysisParser
+from .trie import OpeningTrie
+from .bulk import parse_many
 from .error import ParserError
@@ -1,9 +1,17 @@
 from typing import Protocol, Any
 
-from src.models.move import UciMove
-
-from ..models import Analysis, Color, Score, ScoreName, Move, SanMove, UciMove
+from ..models import (
+    Analysis,
+    Color,
+    Score,
+    ScoreName,
+    Move,
+    SanMove,
+    UciMove,
+    InfoLine,
+)
 from ..chess import ChessPy, ChessError
+from ..models.info import parse_info_line
 from .error import ParserError
 
 
@@ -33,68 +41,120 @@ class AnalysisParser(Protocol):
         """
         raise NotImplementedError
 
+    def parse_game(
+        self,
+        analysis_lines: list[list[Any] | None],
+        initial_fen: str,
+        moves: list[Move],
+    ) -> list[list[Analysis] | None]:
+        """
+        Parses analysis lines of the whole game
+
+        Walks the game once, so parsing is linear in number of moves.
+
+        Args:
+            analysis_lines (list[list[Any] | None]): Analysis lines of each position, 0 is the initial position.
+                                                     None for positions that were not analyzed.
+            initial_fen (str)
+            moves (list[Move])
+
+        Returns:
+            list[list[Analysis] | None]: Analyses of each position. None for positions that were not analyzed.
+
+        Raises:
+            TypeError
+            ValueError
+            ParserError
+        """
+        raise NotImplementedError
+
 
 class StockfishAnalysisParser:
     def __init__(self):
         self.chessboard = ChessPy()
 
     def parse(
-        self, analysis_line: str, initial_fen: str, moves: list[Move]
+        self, analysis_line: InfoLine | str, initial_fen: str, moves: list[Move]
     ) -> Analysis:
-        # example:
+        # Engine returns parsed lines, raw info output is accepted too, e.g.:
         # info depth 25 seldepth 31 multipv 1 score cp 33 nodes 4464545 nps 1267256
         # hashfull 937 tbhits 0 time 3523 pv e2e4 e7e5 g1f3 b8c6 f1b5 a7a6 b5a4 g8f6
         # e1g1 f6e4 d2d4 b7b5 a4b3 d7d5 d4e5 c8e6 c2c3 f8e7 b3c2 e6g4 f1e1 e8g8 b1d2
         # c6e5 d2e4 g4f3 g2f3 d5e4 c2e4
 
-        if not isinstance(analysis_line, str) or not isinstance(moves, list):
+        if not isinstance(analysis_line, InfoLine | str) or not isinstance(moves, list):
             raise TypeError("Invalid argument types")
 
-        uci_move, multipv, score_name, score_value = None, None, None, None
-        parts = analysis_line.split(" ")
         try:
-            for i, part in enumerate(parts):
-                if part == "multipv":
-                    multipv = int(parts[i + 1])
-                elif part == "score":
-                    score_name = parts[i + 1]
-                    score_value = int(parts[i + 2])
-                elif part == "pv":
-                    uci_move = parts[i + 1]
-                    break
-        except (IndexError, ValueError) as e:
+            self.chessboard.from_fen(initial_fen)
+            for move in moves:
+                self.chessboard.move(move.uci_move.value)
+        except (ChessError, TypeError, ValueError) as e:
             raise ParserError(e)
 
-        if (
-            uci_move is None
-            or multipv is None
-            or score_name is None
-            or score_value is None
-        ):
-            raise ParserError("Invalid analysis line")
+        return self._parse(analysis_line)
 
+    def parse_game(
+        self,
+        analysis_lines: list[list[InfoLine] | None] | list[list[str] | None],
+        initial_fen: str,
+        moves: list[Move],
+    ) -> list[list[Analysis] | None]:
+        if not isinstance(analysis_lines, list) or not isinstance(moves, list):
+            raise TypeError("Invalid argument types")
+
+        if len(analysis_lines) > len(moves) + 1:
+            raise ValueError("Invalid argument values")
+
+        analyses: list[list[Analysis] | None] = [None] * len(analysis_lines)
         try:
             self.chessboard.from_fen(initial_fen)
-            for move in moves:
-                self.chessboard.move(move.uci_move.value)
+            for i, lines in enumerate(analysis_lines):
+                if lines is not None:
+                    analyses[i] = [self._parse(line) for line in lines]
+                if i < len(moves) and i + 1 < len(analysis_lines):
+                    self.chessboard.move(moves[i].uci_move.value)
+        except (ChessError, TypeError, ValueError) as e:
+            raise ParserError(e)
+        return analyses
+
+    def _parse(self, analysis_line: InfoLine | str) -> Analysis:
+        # Parses line in current position of the chessboard
+        if isinstance(analysis_line, str):
+            line = parse_info_line(analysis_line)
+            if line is None:
+                raise ParserError("Invalid analysis line")
+            analysis_line = line
+        elif not isinstance(analysis_line, InfoLine):
+            raise TypeError("Invalid argument types")
+
+        uci_move = analysis_line.pv[0]
+        score_value = analysis_line.score_value
+
+        try:
             san_move = self.chessboard.uci_to_san(uci_move)
             side = Color(self.chessboard.color())
-            move = Move(SanMove(san_move), UciMove(uci_move), side)
+            # Moves were validated by the chessboard
+            move = Move.trusted(
+                SanMove.trusted(san_move), UciMove.trusted(uci_move), side
+            )
         except (ChessError, TypeError, ValueError) as e:
             raise ParserError(e)
 
         if side == Color.BLACK:
             score_value *= -1
 
-        if score_name == ScoreName.CP.value:
+        if analysis_line.score_name == ScoreName.CP.value:
             score_name = ScoreName.CP
-        elif score_name == ScoreName.MATE.value:
+        elif analysis_line.score_name == ScoreName.MATE.value:
             score_name = ScoreName.MATE
         else:
             raise ParserError("Invalid score name")
 
-        return Analysis(
-            move=move, multipv=multipv, score=Score(score_name, score_value)
+        return Analysis.trusted(
+            move=move,
+            multipv=analysis_line.multipv,
+            score=Score.trusted(score_name, score_value),
         )
 
 
@@ -0,0 +1,82 @@
+from asyncio import gather, get_running_loop
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+
+from ..models import Game
+from .game import GameParser
+
+
+# Parsers of a worker process, kept between chunks to keep their opening tries
+_parsers: dict[type, Any] = {}
+
+
+async def parse_many(
+    game_parser: GameParser,
+    games: list[Any],
+    username: str,
+    executor: ProcessPoolExecutor | None = None,
+    chunk_size: int = 250,
+) -> list[Game]:
+    """
+    Parses batch of chess games
+
+    Games are split into chunks parsed by executor's processes, so parsing
+    uses all cores and does not block the event loop, even for a batch that
+    fits into a single chunk. Each process uses its own parser of the same
+    type, created without arguments. Games are parsed serially by the given
+    parser without executor or if executor's processes died.
+
+    Args:
+        game_parser (GameParser)
+        games (list[Any])
+        username (str): Needed to determine player's side.
+        executor (ProcessPoolExecutor | None)
+        chunk_size (int): Number of games sent to a process at once
+
+    Returns:
+        list[Game]: Parsed games, in order.
+
+    Raises:
+        TypeError
+        ValueError
+        ParserError
+    """
+    if (
+        not isinstance(games, list)
+        or not isinstance(username, str)
+        or not isinstance(executor, ProcessPoolExecutor | None)
+        or not isinstance(chunk_size, int)
+    ):
+        raise TypeError("Invalid argument types")
+
+    if chunk_size < 1:
+        raise ValueError("Invalid argument values")
+
+    if executor is None:
+        return [game_parser.parse(game, username) for game in games]
+
+    loop = get_running_loop()
+    try:
+        chunks = await gather(
+            *(
+                loop.run_in_executor(
+                    executor,
+                    _parse_chunk,
+                    type(game_parser),
+                    games[i : i + chunk_size],
+                    username,
+                )
+                for i in range(0, len(games), chunk_size)
+            )
+        )
+    except BrokenProcessPool:
+        return [game_parser.parse(game, username) for game in games]
+    return [game for chunk in chunks for game in chunk]
+
+
+def _parse_chunk(parser_type: type, games: list[Any], username: str) -> list[Game]:
+    parser = _parsers.get(parser_type)
+    if parser is None:
+        parser = _parsers[parser_type] = parser_type()
+    return [parser.parse(game, username) for game in games]
@@ -2,13 +2,46 @@ from typing import Protocol, Any
 
 from .error import ParserError
 from .utils import parse_pgn_moves
-from ..models import Game, Player, Move, SanMove, UciMove, Color, Platform
+from .trie import OpeningTrie
+from ..models import (
+    Game,
+    Player,
+    Move,
+    SanMove,
+    UciMove,
+    Color,
+    Platform,
+    Analysis,
+    Score,
+    ScoreName,
+)
 from ..chess import ChessPy, ChessError
 
 
 class GameParser(Protocol):
     """Game Parser Interface"""
 
+    platform: Platform
+
+    def game_id(self, game: Any) -> str:
+        """
+        Returns identifier of unparsed chess game
+
+        Identifier is the same as `game_id` of the parsed game, but is
+        extracted without parsing the game.
+
+        Args:
+            game (Any)
+
+        Returns:
+            str
+
+        Raises:
+            TypeError
+            ParserError
+        """
+        raise NotImplementedError
+
     def parse(self, game: Any, username: str) -> Game:
         """
         Parses chess game
@@ -28,8 +61,23 @@ class GameParser(Protocol):
 
 
 class ChessComGameParser:
-    def __init__(self):
+    platform = Platform.CHESSCOM
+
+    def __init__(self, trie: OpeningTrie | None = None):
+        if not isinstance(trie, OpeningTrie | None):
+            raise TypeError("Invalid argument types")
+
         self.chessboard = ChessPy()
+        self.trie = trie if trie is not None else OpeningTrie()
+
+    def game_id(self, game: dict[str, Any]) -> str:
+        if not isinstance(game, dict):
+            raise TypeError("Invalid argument types")
+
+        try:
+            return game["uuid"]
+        except KeyError as e:
+            raise ParserError(e)
 
     def parse(self, game: dict[str, Any], username: str) -> Game:
         if not isinstance(game, dict) or not isinstance(username, str):
@@ -50,14 +98,8 @@ class ChessComGameParser:
             raise ParserError(e)
 
         san_moves = parse_pgn_moves(game["pgn"])
-        moves: list[Move] = []
         try:
-            self.chessboard.from_fen(initial_fen)
-            for san_move in san_moves:
-                uci_move = self.chessboard.san_to_uci(san_move)
-                side = Color(self.chessboard.color())
-                moves.append(Move(SanMove(san_move), UciMove(uci_move), side))
-                self.chessboard.move(uci_move)
+            moves = self.trie.convert(self.chessboard, initial_fen, san_moves)
         except (ChessError, TypeError, ValueError) as e:
             raise ParserError(e)
 
@@ -71,7 +113,7 @@ class ChessComGameParser:
         try:
             return Game(
                 game_id=game_id,
-                platform=Platform.CHESSCOM,
+                platform=self.platform,
                 url=url,
                 white=white,
                 black=black,
@@ -85,8 +127,22 @@ class ChessComGameParser:
 
 
 class LichessGameParser:
-    def __init__(self):
+    platform = Platform.LICHESS
+
+    def __init__(self, trie: OpeningTrie | None = None):
+        if not isinstance(trie, OpeningTrie | None):
+            raise TypeError("Invalid argument types")
+
         self.chessboard = ChessPy()
+        self.trie = trie if trie is not None else OpeningTrie()
+
+    def game_id(self, game: Any) -> str:
+        assert isinstance(game, dict), ["Invalid game type", game]
+
+        try:
+            return game["id"]
+        except KeyError as e:
+            raise ParserError(e)
 
     def parse(self, game: Any, username: str) -> Game:
         assert isinstance(game, dict), ["Invalid game type", game]
@@ -111,14 +167,16 @@ class LichessGameParser:
             initial_fen = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
 
         san_moves = game["moves"].split(" ")
-        moves: list[Move] = []
+        # Server analysis, present only if the game was analyzed
+        evals = game.get("analysis")
+        if not isinstance(evals, list | None):
+            raise ParserError("Invalid analysis")
         try:
-            self.chessboard.from_fen(initial_fen)
-            for san_move in san_moves:
-                uci_move = self.chessboard.san_to_uci(san_move)
-                side = Color(self.chessboard.color())
-                moves.append(Move(SanMove(san_move), UciMove(uci_move), side))
-                self.chessboard.move(uci_move)
+            moves = self.trie.convert(self.chessboard, initial_fen, san_moves)
+            analyses = None
+            if evals is not None:
+                best_moves = self._best_moves(evals, initial_fen, moves)
+                analyses = self._analyses(evals, moves, best_moves)
         except (ChessError, TypeError, ValueError) as e:
             raise ParserError(e)
 
@@ -132,18 +190,58 @@ class LichessGameParser:
         try:
             return Game(
                 game_id=game_id,
-                platform=Platform.LICHESS,
+                platform=self.platform,
                 url=url,
                 white=white,
                 black=black,
                 side=side,
                 initial_fen=initial_fen,
                 moves=moves,
-                analyses=None,
+                analyses=analyses,
             )
         except (TypeError, ValueError) as e:
             raise ParserError(e)
 
+    def _best_moves(
+        self, evals: list[Any], initial_fen: str, moves: list[Move]
+    ) -> list[Move | None]:
+        # Best move is given only where the played move was a mistake,
+        # it replaces the move played in the position before it
+        best_moves: list[Move | None] = [None] * len(moves)
+        self.chessboard.from_fen(initial_fen)
+        for i, move in enumerate(moves):
+            evaluation = evals[i] if i < len(evals) else None
+            if isinstance(evaluation, dict) and "best" in evaluation:
+                uci_move = evaluation["best"]
+                san_move = self.chessboard.uci_to_san(uci_move)
+                best_moves[i] = Move.trusted(
+                    SanMove.trusted(san_move), UciMove.trusted(uci_move), move.side
+                )
+            self.chessboard.move(move.uci_move.value)
+        return best_moves
+
+    @staticmethod
+    def _analyses(
+        evals: list[Any], moves: list[Move], best_moves: list[Move | None]
+    ) -> list[list[Analysis] | None]:
+        # Eval k is the evaluation after k + 1 plies, from white's side.
+        # Position without evaluation or without a move to play is left
+        # for the engine, including the initial position.
+        analyses: list[list[Analysis] | None] = [None] * (len(moves) + 1)
+        for k, evaluation in enumerate(evals[: len(moves)]):
+            index = k + 1
+            if index == len(moves) or not isinstance(evaluation, dict):
+                continue
+            if "eval" in evaluation:
+                score = Score(ScoreName.CP, evaluation["eval"])
+            elif "mate" in evaluation:
+                score = Score(ScoreName.MATE, evaluation["mate"])
+            else:
+                continue
+            move = best_moves[index] or moves[index]
+            analyses[index] = [Analysis.trusted(move=move, multipv=1, score=score)]
+        return analyses
+
 
 async def main():
     # testing
@@ -0,0 +1,121 @@
+from ..models import Move, SanMove, UciMove, Color
+from ..chess import ChessPy
+
+
+class OpeningTrie:
+    """
+    Opening Trie
+
+    Memoizes conversion of SAN moves from a starting position. Every node
+    holds the converted move, so games sharing an opening are converted only
+    from the first move outside of the trie. Position of a node is stored the
+    first time a game continues from it, as FENs are expensive to generate.
+    Only first `max_depth` plies of each game are memoized and no nodes are
+    added once the trie holds `max_nodes`. Trie can be shared by parsers.
+
+    Args:
+        max_nodes (int)
+        max_depth (int): Number of plies of each game that are memoized
+
+    Raises:
+        TypeError
+        ValueError
+    """
+
+    def __init__(self, max_nodes: int = 100_000, max_depth: int = 20):
+        if not isinstance(max_nodes, int) or not isinstance(max_depth, int):
+            raise TypeError("Invalid argument types")
+
+        if max_nodes < 1 or max_depth < 0:
+            raise ValueError("Invalid argument values")
+
+        self.max_nodes = max_nodes
+        self.max_depth = max_depth
+        self.nodes = 0
+        self._roots: dict[str, _Node] = {}
+
+    def convert(
+        self, chessboard: ChessPy, initial_fen: str, san_moves: list[str]
+    ) -> list[Move]:
+        """
+        Converts SAN moves, leaving the chessboard in the final position
+
+        Args:
+            chessboard (ChessPy)
+            initial_fen (str)
+            san_moves (list[str])
+
+        Returns:
+            list[Move]: Moves, shared with other games of the same opening.
+
+        Raises:
+            TypeError
+            ValueError
+            ChessError: If FEN or any move is invalid.
+        """
+        chessboard.from_fen(initial_fen)
+        node = self._roots.get(initial_fen)
+        if node is None and self.nodes < self.max_nodes:
+            node = _Node(None, initial_fen)
+            self._roots[initial_fen] = node
+            self.nodes += 1
+
+        # Deepest memoized position
+        moves: list[Move] = []
+        while node is not None and len(moves) < len(san_moves):
+            child = node.children.get(san_moves[len(moves)])
+            if child is None:
+                break
+            assert child.move is not None
+            moves.append(child.move)
+            node = child
+
+        if node is not None and moves:
+            if node.fen is None:
+                for move in moves:
+                    chessboard.move(move.uci_move.value)
+                node.fen = chessboard.to_fen()
+            else:
+                chessboard.from_fen(node.fen)
+
+        for san_move in san_moves[len(moves) :]:
+            uci_move = chessboard.san_to_uci(san_move)
+            side = Color(chessboard.color())
+            # Moves were validated by the chessboard
+            move = Move.trusted(
+                SanMove.trusted(san_move), UciMove.trusted(uci_move), side
+            )
+            chessboard.move(uci_move)
+            moves.append(move)
+
+            if (
+                node is not None
+                and len(moves) <= self.max_depth
+                and self.nodes < self.max_nodes
+            ):
+                child = _Node(move, None)
+                node.children[san_move] = child
+                self.nodes += 1
+                node = child
+            else:
+                node = None
+        return moves
+
+    def clear(self) -> None:
+        """Removes all nodes"""
+        self._roots = {}
+        self.nodes = 0
+
+    def __repr__(self) -> str:
+        return f"OpeningTrie({self.max_nodes}, {self.max_depth})"
+
+
+class _Node:
+    """Position reached by a sequence of moves"""
+
+    __slots__ = ("move", "fen", "children")
+
+    def __init__(self, move: Move | None, fen: str | None):
+        self.move = move
+        self.fen = fen
+        self.children: dict[str, _Node] = {}
@@ -0,0 +1,3 @@
+from .pipeline import Pipeline
+from .index import GameIndex
+from .error import PipelineError
@@ -0,0 +1,175 @@
+from sqlite3 import connect, Error as SQLiteError
+
+from ..models import Platform
+from .error import PipelineError
+
+
+class GameIndex:
+    """
+    Persistent Index of Processed Games
+
+    Stores identifiers of games whose puzzles were already created, per
+    platform and user, in a SQLite database, along with the period whose
+    games of the user were synced.
+
+    Args:
+        path (str): Path to database file, ":memory:" keeps index in memory
+
+    Raises:
+        TypeError
+        ValueError
+        PipelineError: If failed to open database.
+    """
+
+    def __init__(self, path: str):
+        if not isinstance(path, str):
+            raise TypeError("Invalid argument types")
+
+        if not path:
+            raise ValueError("Invalid argument values")
+
+        self.path = path
+
+        try:
+            self._connection = connect(path)
+            self._connection.executescript(
+                """
+                PRAGMA journal_mode = WAL;
+                PRAGMA synchronous = NORMAL;
+                CREATE TABLE IF NOT EXISTS games (
+                    platform TEXT NOT NULL,
+                    username TEXT NOT NULL,
+                    game_id TEXT NOT NULL,
+                    PRIMARY KEY (platform, username, game_id)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS syncs (
+                    platform TEXT NOT NULL,
+                    username TEXT NOT NULL,
+                    since INTEGER NOT NULL,
+                    until INTEGER NOT NULL,
+                    PRIMARY KEY (platform, username)
+                );
+                """
+            )
+        except SQLiteError as e:
+            raise PipelineError(e)
+
+    def contains(self, platform: Platform, username: str, game_id: str) -> bool:
+        """
+        Checks whether game of the user was processed
+
+        Args:
+            platform (Platform)
+            username (str)
+            game_id (str)
+
+        Returns:
+            bool
+
+        Raises:
+            PipelineError: If failed to query database.
+        """
+        try:
+            row = self._connection.execute(
+                "SELECT 1 FROM games "
+                "WHERE platform = ? AND username = ? AND game_id = ?",
+                (platform.value, username.lower(), game_id),
+            ).fetchone()
+        except SQLiteError as e:
+            raise PipelineError(e)
+        return row is not None
+
+    def add(self, platform: Platform, username: str, game_id: str) -> None:
+        """
+        Marks game of the user as processed
+
+        Args:
+            platform (Platform)
+            username (str)
+            game_id (str)
+
+        Raises:
+            PipelineError: If failed to write into database.
+        """
+        try:
+            self._connection.execute(
+                "INSERT OR IGNORE INTO games (platform, username, game_id) "
+                "VALUES (?, ?, ?)",
+                (platform.value, username.lower(), game_id),
+            )
+            self._connection.commit()
+        except SQLiteError as e:
+            raise PipelineError(e)
+
+    def synced(self, platform: Platform, username: str) -> tuple[int, int] | None:
+        """
+        Returns period whose games of the user were synced
+
+        Args:
+            platform (Platform)
+            username (str)
+
+        Returns:
+            tuple[int, int] | None: Since and until as unix timestamps. None if user was never synced.
+
+        Raises:
+            PipelineError: If failed to query database.
+        """
+        try:
+            row = self._connection.execute(
+                "SELECT since, until FROM syncs WHERE platform = ? AND username = ?",
+                (platform.value, username.lower()),
+            ).fetchone()
+        except SQLiteError as e:
+            raise PipelineError(e)
+        return None if row is None else (row[0], row[1])
+
+    def set_synced(
+        self, platform: Platform, username: str, since: int, until: int
+    ) -> None:
+        """
+        Stores period whose games of the user were synced
+
+        Args:
+            platform (Platform)
+            username (str)
+            since (int)
+            until (int)
+
+        Raises:
+            PipelineError: If failed to write into database.
+        """
+        try:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO syncs (platform, username, since, until) "
+                "VALUES (?, ?, ?, ?)",
+                (platform.value, username.lower(), since, until),
+            )
+            self._connection.commit()
+        except SQLiteError as e:
+            raise PipelineError(e)
+
+    def clear(self) -> None:
+        """
+        Removes all games and synced periods
+
+        Raises:
+            PipelineError: If failed to write into database.
+        """
+        try:
+            self._connection.executescript("DELETE FROM games; DELETE FROM syncs;")
+        except SQLiteError as e:
+            raise PipelineError(e)
+
+    def close(self) -> None:
+        """Closes database"""
+        self._connection.close()
+
+    def __enter__(self) -> "GameIndex":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"GameIndex({self.path})"
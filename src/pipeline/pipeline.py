@@ -0,0 +1,299 @@
+from asyncio import Queue, create_task, gather
+from concurrent.futures import ProcessPoolExecutor
+from os import cpu_count
+from time import time
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Iterable
+
+from ..fetcher import Fetcher
+from ..parser import GameParser, AnalysisParser, parse_many
+from ..engine import Engine
+from ..puzzle import PuzzleCreator
+from ..models import Game, Puzzle
+from .index import GameIndex
+
+
+# Number of games sent to a single process. Downloaded games are parsed in
+# batches starting at a single chunk, so that first games are parsed promptly,
+# growing up to a chunk per executor's process
+PARSE_CHUNK_SIZE = 16
+# Maximal number of downloaded games parsed at once
+MAX_PARSE_BATCH_SIZE = 256
+# Seconds before the last sync from which games are fetched again, as
+# platforms may publish games late, already processed games are skipped
+SYNC_OVERLAP = 86400
+
+
+class Pipeline:
+    """
+    Puzzle Pipeline
+
+    Fetches player's games, analyzes them and creates puzzles. Engine results
+    of a game are parsed and its puzzles are created as soon as its last
+    position is analyzed, so first puzzles are available long before the whole
+    batch is done.
+
+    With index, games already processed for the player are skipped before
+    they are parsed, and fetching of a period starting inside the synced one
+    starts shortly before its end.
+
+    Args:
+        fetcher (Fetcher)
+        game_parser (GameParser)
+        engine (Engine)
+        analysis_parser (AnalysisParser)
+        puzzle_creator (PuzzleCreator)
+        executor (ProcessPoolExecutor | None): Parses fetched games in parallel
+        index (GameIndex | None): Processed games, shared by runs
+        parse_workers (int | None): Number of executor's processes. Defaults to number of CPUs, like executor's.
+
+    Raises:
+        TypeError
+        ValueError
+    """
+
+    def __init__(
+        self,
+        fetcher: Fetcher,
+        game_parser: GameParser,
+        engine: Engine,
+        analysis_parser: AnalysisParser,
+        puzzle_creator: PuzzleCreator,
+        executor: ProcessPoolExecutor | None = None,
+        index: GameIndex | None = None,
+        parse_workers: int | None = None,
+    ):
+        if not isinstance(parse_workers, int | None):
+            raise TypeError("Invalid argument types")
+
+        if parse_workers is not None and parse_workers < 1:
+            raise ValueError("Invalid argument values")
+
+        self.fetcher = fetcher
+        self.game_parser = game_parser
+        self.engine = engine
+        self.analysis_parser = analysis_parser
+        self.puzzle_creator = puzzle_creator
+        self.executor = executor
+        self.index = index
+        self.parse_workers = parse_workers or cpu_count() or 1
+
+    async def run(
+        self, username: str, since: int, until: int | None = None
+    ) -> list[Puzzle]:
+        """
+        Creates puzzles from player's games
+
+        Args:
+            username (str)
+            since (int): Since when to fetch the games as unix timestamp.
+            until (int | None): Until when to fetch the games as unix timestamp. Defaults to now.
+
+        Returns:
+            list[Puzzle]: All found puzzles. Could be empty.
+
+        Raises:
+            TypeError
+            ValueError
+            FetcherError
+            ParserError
+            EngineError
+        """
+        return [puzzle async for puzzle in self.stream(username, since, until)]
+
+    async def stream(
+        self, username: str, since: int, until: int | None = None
+    ) -> AsyncIterator[Puzzle]:
+        """
+        Creates puzzles from player's games, yielding them as soon as they are found
+
+        Games are parsed and analyzed while they are still being downloaded.
+
+        Same as `run`.
+        """
+        if self.index is None:
+            async for puzzle in self.create(self._games(username, since, until)):
+                yield puzzle
+            return
+
+        index = self.index
+        platform = self.game_parser.platform
+        # Future is not synced yet, fetchers stop at the current time too
+        synced_until = int(time())
+        if until is not None:
+            until = synced_until = min(until, synced_until)
+        synced = index.synced(platform, username)
+        # Fetching skips the synced period only if the requested one starts
+        # inside it, otherwise the whole period is fetched and processed
+        # games are skipped by their identifiers
+        fetch_since = since
+        if synced is not None and synced[0] <= since <= synced[1]:
+            fetch_since = max(since, synced[1] - SYNC_OVERLAP)
+
+        def processed(game: Game) -> None:
+            index.add(platform, username, game.game_id)
+
+        if fetch_since <= synced_until:
+            async for puzzle in self.create(
+                self._games(username, fetch_since, until), processed
+            ):
+                yield puzzle
+
+        # Overlapping periods are merged, otherwise the later one is kept
+        if since > synced_until:
+            return
+        if synced is None or (since <= synced[1] and synced_until >= synced[0]):
+            index.set_synced(
+                platform,
+                username,
+                since if synced is None else min(since, synced[0]),
+                synced_until if synced is None else max(synced_until, synced[1]),
+            )
+        elif synced_until > synced[1]:
+            index.set_synced(platform, username, since, synced_until)
+
+    async def create(
+        self,
+        games: Iterable[Game] | AsyncIterable[Game],
+        processed: Callable[[Game], Any] | None = None,
+    ) -> AsyncIterator[Puzzle]:
+        """
+        Analyzes games and creates puzzles, yielding them as soon as they are found
+
+        Analyses are assigned to the games. Positions that already have
+        analyses, such as platform's own evaluations, are not analyzed again.
+        Games are read only as fast as engine analyzes them.
+
+        Args:
+            games (Iterable[Game] | AsyncIterable[Game])
+            processed (Callable[[Game], Any] | None): Called with every game once its puzzles were yielded
+
+        Yields:
+            Puzzle
+
+        Raises:
+            ParserError
+            EngineError
+        """
+        pending: dict[str, Game] = {}
+        remaining: dict[str, int] = {}
+        analyses: dict[str, list[Any]] = {}
+        engine_lines: dict[str, list[Any]] = {}
+        # Engine results and games with nothing to analyze, as soon as they
+        # are done, followed by None
+        done: Queue[tuple[str, int, Any] | Game | Exception | None] = Queue(maxsize=16)
+
+        async def engine_games() -> (
+            AsyncIterator[tuple[str, str, list[str], list[int]]]
+        ):
+            async for game in _iterate(games):
+                # Positions evaluated by the platform and positions the puzzle
+                # creator never looks at are not analyzed
+                if game.analyses is not None:
+                    game_analyses = list(game.analyses)
+                else:
+                    game_analyses = [None] * (len(game.moves) + 1)
+                plies = sorted(
+                    i
+                    for i in set(self.puzzle_creator.plies(game))
+                    if game_analyses[i] is None
+                )
+                if not plies:
+                    game.analyses = game_analyses
+                    await done.put(game)
+                    continue
+
+                pending[game.game_id] = game
+                analyses[game.game_id] = game_analyses
+                remaining[game.game_id] = len(plies)
+                engine_lines[game.game_id] = [None] * (len(game.moves) + 1)
+                yield (
+                    game.game_id,
+                    game.initial_fen,
+                    [move.uci_move.value for move in game.moves],
+                    plies,
+                )
+
+        async def analyze() -> None:
+            try:
+                async for result in self.engine.analyze_stream(engine_games()):
+                    await done.put(result)
+            except Exception as e:
+                await done.put(e)
+            else:
+                await done.put(None)
+
+        analyzer = create_task(analyze())
+        try:
+            while (result := await done.get()) is not None:
+                if isinstance(result, Exception):
+                    raise result
+                if isinstance(result, Game):
+                    game = result
+                else:
+                    game_id, index, lines = result
+                    engine_lines[game_id][index] = lines
+                    remaining[game_id] -= 1
+                    if remaining[game_id] > 0:
+                        continue
+                    # Whole game is parsed at once, walking its moves only once
+                    game = pending.pop(game_id)
+                    del remaining[game_id]
+                    parsed = self.analysis_parser.parse_game(
+                        engine_lines.pop(game_id), game.initial_fen, game.moves
+                    )
+                    game.analyses = [
+                        parsed_analysis if parsed_analysis is not None else analysis
+                        for parsed_analysis, analysis in zip(
+                            parsed, analyses.pop(game_id)
+                        )
+                    ]
+
+                for puzzle in self.puzzle_creator.create(game):
+                    yield puzzle
+                if processed is not None:
+                    processed(game)
+        finally:
+            analyzer.cancel()
+            await gather(analyzer, return_exceptions=True)
+
+    async def _games(
+        self, username: str, since: int, until: int | None
+    ) -> AsyncIterator[Game]:
+        # Without executor every game is parsed as soon as it is downloaded,
+        # with executor games are parsed in growing batches split between
+        # processes
+        batch_size = max_batch_size = 1
+        if self.executor is not None:
+            batch_size = PARSE_CHUNK_SIZE
+            max_batch_size = min(
+                PARSE_CHUNK_SIZE * self.parse_workers, MAX_PARSE_BATCH_SIZE
+            )
+        batch: list[Any] = []
+        async for game in self.fetcher.fetch_stream(username, since, until):
+            if self.index is not None and self.index.contains(
+                self.game_parser.platform, username, self.game_parser.game_id(game)
+            ):
+                continue
+            batch.append(game)
+            if len(batch) < batch_size:
+                continue
+            for parsed_game in await parse_many(
+                self.game_parser, batch, username, self.executor, PARSE_CHUNK_SIZE
+            ):
+                yield parsed_game
+            batch = []
+            batch_size = min(2 * batch_size, max_batch_size)
+
+        for parsed_game in await parse_many(
+            self.game_parser, batch, username, self.executor, PARSE_CHUNK_SIZE
+        ):
+            yield parsed_game
+
+
+async def _iterate(items: Iterable[Any] | AsyncIterable[Any]) -> AsyncIterator[Any]:
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
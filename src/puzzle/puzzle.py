@@ -29,11 +29,49 @@ class PuzzleCreator(Protocol):
         """
         raise NotImplementedError
 
+    def plies(self, game: Game) -> Iterable[int]:
+        """
+        Returns indices of positions that need to be analyzed
+
+        Analyses of other positions are never looked at by `create`,
+        so engine does not have to analyze them.
+
+        Args:
+            game (Game)
+
+        Returns:
+            Iterable[int]: Indices into game's analyses, 0 is the initial position.
+        """
+        raise NotImplementedError
+
 
 class AnalysisBasedPuzzleCreator:
-    """Creates chess puzzles based purely on engine's analysis"""
+    """
+    Creates chess puzzles based purely on engine's analysis
 
-    def __init__(self):
+    Position becomes a puzzle when player's move lets evaluation swing by more
+    than `threshold` centipawns, staying within (-window, window) centipawns.
+    Positions evaluated outside of the window can never become puzzles, so
+    engine's search can be cut off there, e.g. with `Cutoff(2 * window)`.
+
+    Args:
+        threshold (int): Minimal evaluation swing in centipawns
+        window (int): Evaluation after the swing has to be within (-window, window) centipawns
+
+    Raises:
+        TypeError
+        ValueError
+    """
+
+    def __init__(self, threshold: int = 100, window: int = 400):
+        if not isinstance(threshold, int) or not isinstance(window, int):
+            raise TypeError("Invalid argument types")
+
+        if threshold < 0 or window < 1:
+            raise ValueError("Invalid argument values")
+
+        self.threshold = threshold
+        self.window = window
         self.chessboard = ChessPy()
 
     def create(self, game: Game) -> list[Puzzle]:
@@ -41,22 +79,23 @@ class AnalysisBasedPuzzleCreator:
             return []
 
         puzzles: list[Puzzle] = []
-        start = 10 if game.side == Color.WHITE else 11
 
-        for i in range(start, len(game.moves) - 1, 2):
+        for i in self._moves(game):
             move = game.moves[i]
             best_lines = game.analyses[i]
+            next_best_lines = game.analyses[i + 1]
+            if not best_lines or not next_best_lines:
+                continue
             best_score = best_lines[0].score
-            next_best_score = game.analyses[i + 1][0].score
+            next_best_score = next_best_lines[0].score
 
             if (
                 next_best_score.score_name == ScoreName.CP
                 and best_score.score_name == ScoreName.CP
-                and (-400 < next_best_score.score_value < 400)
+                and (-self.window < next_best_score.score_value < self.window)
                 and (
-                    abs(next_best_score.score_value)
-                    - abs(best_score.score_value)
-                    > 100
+                    abs(next_best_score.score_value) - abs(best_score.score_value)
+                    > self.threshold
                 )
             ):
                 uci_moves = [move.uci_move.value for move in game.moves[:i]]
@@ -84,6 +123,19 @@ class AnalysisBasedPuzzleCreator:
                 )
         return puzzles
 
+    def plies(self, game: Game) -> list[int]:
+        # Positions before and after each of player's moves
+        plies: list[int] = []
+        for i in self._moves(game):
+            plies.extend((i, i + 1))
+        return plies
+
+    @staticmethod
+    def _moves(game: Game) -> range:
+        # Player's moves after the opening
+        start = 10 if game.side == Color.WHITE else 11
+        return range(start, len(game.moves) - 1, 2)
+
 
 async def main():
     from ..fetcher import ChessComFetcher
@@ -103,14 +155,10 @@ async def main():
     for game in games:
         uci_moves = [move.uci_move.value for move in game.moves]
         engine_result = await engine.analyze(game.initial_fen, uci_moves)
-        analyses = []
-        for i, analysis in enumerate(engine_result):
-            best_lines = []
-            for line in analysis:
-                analysis = analysis_parser.parse(line, game.initial_fen, game.moves[:i])
-                best_lines.append(analysis)
-            analyses.append(best_lines)
-        game.analyses = analyses
+        # Positions that were not analyzed stay None
+        game.analyses = analysis_parser.parse_game(
+            engine_result, game.initial_fen, game.moves
+        )
 
     for game in games:
         print("GAME: ", game, "\n\n")
@@ -0,0 +1,149 @@
+from asyncio import create_task, run, sleep
+from pathlib import Path
+from socket import socket
+from sys import executable
+
+import pytest
+
+from src.engine.error import EngineError
+from src.parser.error import ParserError
+from src.engine.stockfish.remote import RemoteStockfishEngine, StockfishEngineServer
+from src.engine.stockfish.stockfish import LocalStockfishEngine
+
+FAKE_UCI = Path(__file__).parent.parent / "benchmarks" / "fake_uci.py"
+INITIAL_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+UCI_MOVES = [
+    "e2e4", "e7e5", "g1f3", "b8c6", "f1c4", "g8f6",
+    "d2d3", "f8c5", "c2c3", "d7d6", "e1g1", "e8g8",
+]  # fmt: skip
+
+
+@pytest.fixture
+def engine_path(tmp_path: Path) -> str:
+    path = tmp_path / "engine"
+    path.write_text(f'#!/bin/sh\nexec {executable} {FAKE_UCI} --delay 0.01 "$@"\n')
+    path.chmod(0o755)
+    return str(path)
+
+
+def free_address() -> str:
+    with socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"127.0.0.1:{sock.getsockname()[1]}"
+
+
+def create_servers(engine_path: str, count: int) -> list[StockfishEngineServer]:
+    return [
+        StockfishEngineServer(
+            LocalStockfishEngine(engine_path, depth=5, max_workers=1), free_address()
+        )
+        for _ in range(count)
+    ]
+
+
+async def stop_servers(servers: list[StockfishEngineServer]) -> None:
+    for server in servers:
+        await server.stop()
+    # Lets engine processes killed mid-search be reaped before loop closes
+    await sleep(0.1)
+
+
+def test_game_is_split_across_servers(engine_path: str):
+    async def main():
+        servers = create_servers(engine_path, 2)
+        for server in servers:
+            await server.start()
+        try:
+            async with RemoteStockfishEngine(
+                [server.address for server in servers]
+            ) as engine:
+                analysis = create_task(engine.analyze(INITIAL_FEN, UCI_MOVES))
+                await sleep(0.1)
+                loads = [connection.load for connection in engine._connections]
+                result = await analysis
+        finally:
+            await stop_servers(servers)
+
+        assert all(load > 0 for load in loads)
+        assert len(result) == len(UCI_MOVES) + 1
+        assert all(lines for lines in result)
+
+    run(main())
+
+
+def test_job_is_resumed_when_server_is_killed(engine_path: str):
+    async def main():
+        servers = create_servers(engine_path, 2)
+        for server in servers:
+            await server.start()
+        try:
+            async with RemoteStockfishEngine(
+                [server.address for server in servers], reconnect_delay=60
+            ) as engine:
+                killed = engine._connections[1]
+                analysis = create_task(engine.analyze(INITIAL_FEN, UCI_MOVES))
+                while killed.load == 0:
+                    await sleep(0.01)
+                await servers[1].stop()
+                result = await analysis
+                assert not killed.connected
+        finally:
+            await stop_servers(servers)
+
+        assert len(result) == len(UCI_MOVES) + 1
+        assert all(lines for lines in result)
+
+    run(main())
+
+
+def test_job_fails_when_all_servers_are_killed(engine_path: str):
+    async def main():
+        servers = create_servers(engine_path, 1)
+        await servers[0].start()
+        try:
+            async with RemoteStockfishEngine(
+                [servers[0].address], retries=1, reconnect_delay=0
+            ) as engine:
+                analysis = create_task(engine.analyze(INITIAL_FEN, UCI_MOVES))
+                while engine._connections[0].load == 0:
+                    await sleep(0.01)
+                await servers[0].stop()
+                with pytest.raises(EngineError):
+                    await analysis
+        finally:
+            await stop_servers(servers)
+
+    run(main())
+
+
+def test_invalid_plies_are_rejected_by_client(engine_path: str):
+    async def main():
+        servers = create_servers(engine_path, 1)
+        await servers[0].start()
+        try:
+            async with RemoteStockfishEngine([servers[0].address]) as engine:
+                with pytest.raises(ValueError):
+                    await engine.analyze(INITIAL_FEN, UCI_MOVES, [len(UCI_MOVES) + 1])
+        finally:
+            await stop_servers(servers)
+
+    run(main())
+
+
+def test_input_errors_are_passed_through(engine_path: str):
+    async def games():
+        yield ("game", INITIAL_FEN, UCI_MOVES)
+        raise ParserError("Invalid game")
+
+    async def main():
+        servers = create_servers(engine_path, 1)
+        await servers[0].start()
+        try:
+            async with RemoteStockfishEngine([servers[0].address]) as engine:
+                with pytest.raises(ParserError):
+                    async for _ in engine.analyze_stream(games()):
+                        pass
+        finally:
+            await stop_servers(servers)
+
+    run(main())